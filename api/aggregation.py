@@ -0,0 +1,106 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from player_index import INDEX_COLUMNS, daily_partials, stats_from_totals
+from statcast_store import read_partition_file
+
+# Worker processes for season-scale aggregation; 0 aggregates in-process
+AGGREGATION_PROCESSES = int(os.getenv('STATCAST_AGG_PROCESSES', '0'))
+
+def pitch_types_partial(frame):
+    """Distinct pitch types of one partition, in order of appearance."""
+    return [pt for pt in frame['pitch_type'].unique().tolist() if pd.notnull(pt)]
+
+def player_stats_partial(frame, players=None):
+    """Per-player additive partials of one partition, optionally filtered."""
+    if players is not None:
+        frame = frame[frame['player_name'].isin(players)]
+    return daily_partials(frame)
+
+class PitchTypesAggregate:
+    """Distinct-set merge, keeping first-seen order across partitions."""
+
+    columns = ['pitch_type']
+
+    def __init__(self):
+        self.reduce = pitch_types_partial
+        self._seen = {}
+
+    def merge(self, pitch_types):
+        for pitch_type in pitch_types:
+            self._seen.setdefault(pitch_type, None)
+
+    def result(self):
+        return list(self._seen)
+
+class PlayerStatsAggregate:
+    """Sum of per-day player partials; memory grows with players, not days."""
+
+    columns = INDEX_COLUMNS
+
+    def __init__(self, players=None):
+        self.reduce = partial(player_stats_partial, players=players)
+        self._totals = None
+
+    def merge(self, partials):
+        if partials.empty:
+            return
+        if self._totals is None:
+            self._totals = partials
+        else:
+            self._totals = pd.concat([self._totals, partials]).groupby(level=0).sum()
+
+    def result(self):
+        if self._totals is None:
+            return {}
+        return {
+            player_name: stats_from_totals(player_name, totals)
+            for player_name, totals in self._totals.iterrows()
+        }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _process_pool(processes):
+    # Started lazily and kept for the life of the server; forking per request
+    # would cost more than small ranges take to aggregate
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes)
+        return _pool
+
+def _reduce_file(reduce, path, columns, compact):
+    return reduce(read_partition_file(path, columns, compact))
+
+def aggregate_view(view, aggregate, processes=None):
+    """Fold a PartitionView into an aggregate one date partition at a time.
+
+    Only one partition frame and the running aggregate are alive at once, so
+    peak memory depends on the partition size rather than the range length.
+    With processes > 0, persisted partitions are reduced in a process pool
+    and only their (small) partials come back to this process.
+    """
+    processes = AGGREGATION_PROCESSES if processes is None else processes
+    compact = view.store.compact
+
+    if processes <= 0:
+        for _, frame in view.iter_partitions(aggregate.columns):
+            aggregate.merge(aggregate.reduce(frame))
+        return aggregate.result()
+
+    # Unsettled days only exist in this process; they are also the newest,
+    # so folding them first keeps the newest-first order
+    for day in view.days:
+        if day in view.recent:
+            aggregate.merge(aggregate.reduce(view.read(day, aggregate.columns)))
+    paths = [view.store.partition_path(day) for day in view.days if day not in view.recent]
+    reduce_file = partial(_reduce_file, aggregate.reduce, columns=aggregate.columns, compact=compact)
+    # map yields in submission order, which order-sensitive merges rely on
+    for result in _process_pool(processes).map(reduce_file, paths):
+        aggregate.merge(result)
+    return aggregate.result()
@@ -1,46 +1,44 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from pybaseball import statcast
 from datetime import datetime, timedelta
-import pandas as pd
+import json
+import os
+
+from aggregation import PitchTypesAggregate, PlayerStatsAggregate, aggregate_view
+from jobs import JobManager, TooManyJobs
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, paginate, stream_ndjson
+from player_index import PlayerStatsIndex
+from processing import process_baseball_stats
+from statcast_store import StatcastStore, to_date
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-def process_baseball_stats(data):
-    # Process and clean the data
-    processed_stats = []
-    
-    for _, row in data.iterrows():
-        # Helper function to handle NaN values
-        def clean_value(value):
-            if pd.isna(value) or pd.isnull(value):
-                return None
-            return value
-
-        stat = {
-            'game_date': row.get('game_date', '').strftime('%Y-%m-%d') if pd.notnull(row.get('game_date')) else None,
-            'player_name': clean_value(row.get('player_name', '')),
-            'pitch_type': clean_value(row.get('pitch_type', '')),
-            'release_speed': float(row.get('release_speed')) if pd.notnull(row.get('release_speed')) else None,
-            'effective_speed': float(row.get('effective_speed')) if pd.notnull(row.get('effective_speed')) else None,
-            'strikes': int(row.get('strikes', 0)) if pd.notnull(row.get('strikes')) else 0,
-            'balls': int(row.get('balls', 0)) if pd.notnull(row.get('balls')) else 0,
-            'inning': int(row.get('inning', 0)) if pd.notnull(row.get('inning')) else 0,
-            'stand': clean_value(row.get('stand', '')),
-            'hit_distance_sc': float(row.get('hit_distance_sc')) if pd.notnull(row.get('hit_distance_sc')) else None,
-            'hit_speed': float(row.get('launch_speed')) if pd.notnull(row.get('launch_speed')) else None,
-            'events': clean_value(row.get('events', '')),
-            'description': clean_value(row.get('description', '')),
-            'zone': int(row.get('zone', 0)) if pd.notnull(row.get('zone')) else None,
-            'home_team': clean_value(row.get('home_team', '')),
-            'away_team': clean_value(row.get('away_team', '')),
-            'home_score': int(row.get('home_score', 0)) if pd.notnull(row.get('home_score')) else 0,
-            'away_score': int(row.get('away_score', 0)) if pd.notnull(row.get('away_score')) else 0
-        }
-        processed_stats.append(stat)
-    
-    return processed_stats
+# Per-date Parquet cache in front of pybaseball's statcast()
+store = StatcastStore()
+
+# player_name -> aggregates over the player-stats window
+player_index = PlayerStatsIndex()
+
+# Lookups reuse the index this long before it is synced with the store again
+PLAYER_INDEX_TTL_SECONDS = int(os.getenv('PLAYER_INDEX_TTL', '60'))
+
+# Long range queries run here instead of blocking a request worker
+jobs = JobManager(store)
+
+# Synchronous requests may download at most this many uncached days
+MAX_SYNC_FETCH_DAYS = 14
+
+def check_sync_fetch_limit(start_date, end_date):
+    """Reject ranges that would download too much for a request worker."""
+    # Big cold ranges would tie up this worker for minutes
+    missing_days = len(store.missing_dates(start_date, end_date))
+    if missing_days > MAX_SYNC_FETCH_DAYS:
+        return jsonify({
+            'error': f'{missing_days} uncached days exceeds the synchronous limit of {MAX_SYNC_FETCH_DAYS}',
+            'message': 'POST the range to /api/baseball-stats/jobs to cache it first'
+        }), 400
+    return None
 
 @app.route('/api/baseball-stats', methods=['GET'])
 def get_baseball_stats():
@@ -55,8 +53,19 @@ def get_baseball_stats():
         
         print(f"Fetching data from {start_date} to {end_date}")
         
-        # Fetch data using pybaseball
-        data = statcast(start_dt=start_date, end_dt=end_date)
+        error = check_sync_fetch_limit(start_date, end_date)
+        if error:
+            return error
+        
+        # Paginated and streaming modes walk the store one date at a time
+        output_format = request.args.get('format', 'json')
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if output_format != 'json' or limit is not None or cursor is not None:
+            return get_baseball_stats_incremental(start_date, end_date, output_format, limit, cursor)
+        
+        # Read from the local store; only missing dates hit pybaseball
+        data = store.load(start_date, end_date)
         
         if data is None or data.empty:
             return jsonify({
@@ -84,17 +93,145 @@ def get_baseball_stats():
             'message': 'Failed to fetch baseball statistics'
         }), 500
 
+def get_baseball_stats_incremental(start_date, end_date, output_format, limit, cursor):
+    error = validate_incremental_args(output_format, limit)
+    if error:
+        return error
+    
+    view = store.view(start_date, end_date)
+    metadata = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_records': view.total_rows()
+    }
+    
+    if metadata['total_records'] == 0:
+        return jsonify({
+            'error': 'No data available for the specified date range',
+            'start_date': start_date,
+            'end_date': end_date
+        }), 404
+    
+    return respond_with_view(view, metadata, output_format, limit, cursor)
+
+def validate_incremental_args(output_format, limit):
+    if output_format not in ('json', 'ndjson'):
+        return jsonify({'error': f'Unsupported format: {output_format}'}), 400
+    if limit is not None and not 0 < limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    return None
+
+def respond_with_view(view, metadata, output_format, limit, cursor):
+    """Serve a PartitionView as an NDJSON stream or one cursor page."""
+    if output_format == 'ndjson':
+        return Response(
+            stream_with_context(stream_ndjson(view, metadata)),
+            mimetype='application/x-ndjson'
+        )
+    
+    limit = limit or DEFAULT_PAGE_SIZE
+    try:
+        page, next_cursor = paginate(view, limit, cursor)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    metadata.update({
+        'limit': limit,
+        'cursor': cursor,
+        'next_cursor': next_cursor
+    })
+    return jsonify({
+        'data': page,
+        'metadata': metadata
+    })
+
+@app.route('/api/baseball-stats/jobs', methods=['POST'])
+def create_baseball_stats_job():
+    body = request.get_json(silent=True) or {}
+    start_date = body.get('start_date')
+    end_date = body.get('end_date')
+    try:
+        if to_date(start_date) > to_date(end_date):
+            raise ValueError('start_date is after end_date')
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'start_date and end_date must be YYYY-MM-DD: {str(e)}'}), 400
+    
+    try:
+        job = jobs.submit(start_date, end_date)
+    except TooManyJobs as e:
+        return jsonify({'error': str(e), 'message': 'Too many jobs, try again later'}), 429
+    
+    return jsonify(job.to_dict()), 202
+
+@app.route('/api/baseball-stats/jobs/<job_id>', methods=['GET'])
+def get_baseball_stats_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/baseball-stats/jobs/<job_id>', methods=['DELETE'])
+def cancel_baseball_stats_job(job_id):
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/baseball-stats/jobs/<job_id>/events', methods=['GET'])
+def stream_baseball_stats_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    
+    def events():
+        version = None
+        while True:
+            # Heartbeat every 15s keeps proxies from closing an idle stream
+            version = job.wait_for_change(version, timeout=15)
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+            if job.finished:
+                return
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream')
+
+@app.route('/api/baseball-stats/jobs/<job_id>/result', methods=['GET'])
+def get_baseball_stats_job_result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if job.status != 'done':
+        return jsonify({'error': f'Job is {job.status}', 'job': job.to_dict()}), 409
+    
+    output_format = request.args.get('format', 'json')
+    limit = request.args.get('limit', type=int)
+    error = validate_incremental_args(output_format, limit)
+    if error:
+        return error
+    
+    metadata = {
+        'job_id': job.id,
+        'start_date': job.start_date,
+        'end_date': job.end_date,
+        'total_records': job.total_records
+    }
+    return respond_with_view(job.view, metadata, output_format, limit, request.args.get('cursor'))
+
 @app.route('/api/pitch-types', methods=['GET'])
 def get_pitch_types():
     try:
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+        end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
+        start_date = request.args.get('start_date', (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d'))
+        
+        error = check_sync_fetch_limit(start_date, end_date)
+        if error:
+            return error
         
-        data = statcast(start_dt=start_date, end_dt=end_date)
-        pitch_types = data['pitch_type'].unique().tolist()
+        # Distinct set merged partition by partition, so a season costs the
+        # memory of one day
+        pitch_types = aggregate_view(store.view(start_date, end_date), PitchTypesAggregate())
         
         return jsonify({
-            'pitch_types': [pt for pt in pitch_types if pd.notnull(pt)]
+            'pitch_types': pitch_types
         })
         
     except Exception as e:
@@ -103,35 +240,45 @@ def get_pitch_types():
             'message': 'Failed to fetch pitch types'
         }), 500
 
+# Upper bound on players per /api/player-stats/batch request
+MAX_PLAYER_BATCH = 100
+
+def refresh_player_index():
+    """Sync the player index with the last 30 days if stale and return the window."""
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    
+    window = (start_date, end_date)
+    if not player_index.is_fresh(window, PLAYER_INDEX_TTL_SECONDS):
+        # Only days new to the window (or whose content changed) are regrouped
+        player_index.refresh(store.view(start_date, end_date), window)
+    return start_date, end_date
+
 @app.route('/api/player-stats', methods=['GET'])
 def get_player_stats():
     try:
         player_name = request.args.get('player_name')
         if not player_name:
             return jsonify({'error': 'Player name is required'}), 400
-            
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
         
-        data = statcast(start_dt=start_date, end_dt=end_date)
-        player_data = data[data['player_name'] == player_name]
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if start_date or end_date:
+            # Arbitrary (e.g. full season) ranges are aggregated out of core
+            # instead of going through the 30 day index
+            end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+            start_date = start_date or (to_date(end_date) - timedelta(days=30)).isoformat()
+            error = check_sync_fetch_limit(start_date, end_date)
+            if error:
+                return error
+            aggregate = PlayerStatsAggregate(players=[player_name])
+            stats = aggregate_view(store.view(start_date, end_date), aggregate).get(player_name)
+        else:
+            refresh_player_index()
+            stats = player_index.get(player_name)
         
-        if player_data.empty:
+        if stats is None:
             return jsonify({'error': 'No data found for the specified player'}), 404
-            
-        stats = {
-            'player_name': player_name,
-            'games_played': len(player_data['game_date'].unique()),
-            'avg_pitch_speed': player_data['release_speed'].mean(),
-            'total_pitches': len(player_data),
-            'strikes': len(player_data[player_data['type'] == 'S']),
-            'balls': len(player_data[player_data['type'] == 'B']),
-            'hit_stats': {
-                'avg_hit_distance': player_data['hit_distance_sc'].mean(),
-                'avg_launch_speed': player_data['launch_speed'].mean(),
-                'total_hits': len(player_data[player_data['events'].isin(['single', 'double', 'triple', 'home_run'])])
-            }
-        }
         
         return jsonify(stats)
         
@@ -141,5 +288,50 @@ def get_player_stats():
             'message': 'Failed to fetch player statistics'
         }), 500
 
+@app.route('/api/player-stats/batch', methods=['POST'])
+def get_player_stats_batch():
+    try:
+        body = request.get_json(silent=True) or {}
+        players = body.get('players')
+        if not isinstance(players, list) or not players:
+            return jsonify({'error': 'players must be a non-empty list of names or MLBAM ids'}), 400
+        if len(players) > MAX_PLAYER_BATCH:
+            return jsonify({'error': f'At most {MAX_PLAYER_BATCH} players per batch'}), 400
+        for player in players:
+            # JSON true would otherwise pass as the int id 1
+            valid_id = isinstance(player, int) and not isinstance(player, bool)
+            if not valid_id and not (isinstance(player, str) and player.strip()):
+                return jsonify({
+                    'error': f'Invalid player entry {json.dumps(player)}: expected a name or an MLBAM id'
+                }), 400
+        
+        # One refresh for the whole batch, then a dict lookup per player
+        start_date, end_date = refresh_player_index()
+        
+        found = []
+        not_found = []
+        for player in players:
+            stats = player_index.lookup(player)
+            if stats is None:
+                not_found.append(player)
+            else:
+                found.append(stats)
+        
+        return jsonify({
+            'players': found,
+            'not_found': not_found,
+            'metadata': {
+                'start_date': start_date,
+                'end_date': end_date,
+                'requested': len(players)
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'message': 'Failed to fetch player statistics'
+        }), 500
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000) 
\ No newline at end of file
+    app.run(debug=True, port=5000)
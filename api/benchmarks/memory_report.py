@@ -0,0 +1,74 @@
+"""Memory report: full statcast frame vs the compact projection.
+
+Usage (from the api/ directory):
+    python benchmarks/memory_report.py
+    python benchmarks/memory_report.py --rows 120000
+    python benchmarks/memory_report.py --start 2023-09-01 --end 2023-09-30   # real data
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact import compact_statcast  # noqa: E402
+from process_stats import make_statcast_frame  # noqa: E402
+from processing import process_baseball_stats  # noqa: E402
+
+# A month of regular season pitches
+DEFAULT_ROWS = 120_000
+
+# Statcast ships ~90 columns; pad the synthetic frame to a similar width
+FILLER_FLOAT_COLUMNS = 55
+FILLER_STRING_COLUMNS = 15
+
+def make_wide_frame(rows):
+    frame = make_statcast_frame(rows)
+    rng = np.random.default_rng(1)
+    for i in range(FILLER_FLOAT_COLUMNS):
+        frame[f'float_{i}'] = rng.normal(0, 1, rows)
+    for i in range(FILLER_STRING_COLUMNS):
+        frame[f'str_{i}'] = rng.choice(np.array([f'value {j} of column {i}' for j in range(50)], dtype=object), rows)
+    frame['pitcher'] = rng.integers(400000, 700000, rows)
+    frame['batter'] = rng.integers(400000, 700000, rows)
+    frame['game_pk'] = rng.integers(716000, 718000, rows)
+    return frame
+
+def megabytes(frame):
+    return frame.memory_usage(deep=True).sum() / 1024 ** 2
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    parser.add_argument('--start', help='fetch real statcast data from this date')
+    parser.add_argument('--end', help='fetch real statcast data up to this date')
+    args = parser.parse_args()
+
+    if args.start and args.end:
+        from pybaseball import statcast
+        full = statcast(start_dt=args.start, end_dt=args.end)
+    else:
+        full = make_wide_frame(args.rows)
+    compact = compact_statcast(full)
+
+    before, after = megabytes(full), megabytes(compact)
+    print(f"rows: {len(full)}")
+    print(f"full frame:    {len(full.columns):>3} columns {before:>9.1f} MB")
+    print(f"compact frame: {len(compact.columns):>3} columns {after:>9.1f} MB "
+          f"({after / before:.1%} of full)")
+
+    print("\nper column (compact):")
+    usage = compact.memory_usage(deep=True, index=False)
+    for col in compact.columns:
+        print(f"  {col:<18} {str(compact[col].dtype):<16} {usage[col] / 1024 ** 2:>7.2f} MB "
+              f"(was {full[col].memory_usage(deep=True, index=False) / 1024 ** 2:.2f} MB)")
+
+    same = json.dumps(process_baseball_stats(full)) == json.dumps(process_baseball_stats(compact))
+    print(f"\nAPI output: {'identical' if same else 'MISMATCH'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Micro-benchmark: column-wise process_baseball_stats vs the old iterrows loop.
+
+Usage (from the api/ directory):
+    python benchmarks/process_stats.py
+    python benchmarks/process_stats.py --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processing import process_baseball_stats  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 700_000]
+
+PITCH_TYPES = ['FF', 'SL', 'CH', 'CU', 'SI', 'FC', 'ST', None]
+EVENTS = ['single', 'double', 'triple', 'home_run', 'strikeout', 'field_out', 'walk']
+DESCRIPTIONS = ['ball', 'called_strike', 'swinging_strike', 'foul', 'hit_into_play']
+TEAMS = ['LAD', 'NYY', 'HOU', 'TEX', 'CHC', 'STL', 'BOS', 'ATL', 'SD', 'SEA']
+
+def process_baseball_stats_iterrows(data):
+    """The original per-row implementation, kept verbatim as the reference."""
+    processed_stats = []
+
+    for _, row in data.iterrows():
+        # Helper function to handle NaN values
+        def clean_value(value):
+            if pd.isna(value) or pd.isnull(value):
+                return None
+            return value
+
+        stat = {
+            'game_date': row.get('game_date', '').strftime('%Y-%m-%d') if pd.notnull(row.get('game_date')) else None,
+            'player_name': clean_value(row.get('player_name', '')),
+            'pitch_type': clean_value(row.get('pitch_type', '')),
+            'release_speed': float(row.get('release_speed')) if pd.notnull(row.get('release_speed')) else None,
+            'effective_speed': float(row.get('effective_speed')) if pd.notnull(row.get('effective_speed')) else None,
+            'strikes': int(row.get('strikes', 0)) if pd.notnull(row.get('strikes')) else 0,
+            'balls': int(row.get('balls', 0)) if pd.notnull(row.get('balls')) else 0,
+            'inning': int(row.get('inning', 0)) if pd.notnull(row.get('inning')) else 0,
+            'stand': clean_value(row.get('stand', '')),
+            'hit_distance_sc': float(row.get('hit_distance_sc')) if pd.notnull(row.get('hit_distance_sc')) else None,
+            'hit_speed': float(row.get('launch_speed')) if pd.notnull(row.get('launch_speed')) else None,
+            'events': clean_value(row.get('events', '')),
+            'description': clean_value(row.get('description', '')),
+            'zone': int(row.get('zone', 0)) if pd.notnull(row.get('zone')) else None,
+            'home_team': clean_value(row.get('home_team', '')),
+            'away_team': clean_value(row.get('away_team', '')),
+            'home_score': int(row.get('home_score', 0)) if pd.notnull(row.get('home_score')) else 0,
+            'away_score': int(row.get('away_score', 0)) if pd.notnull(row.get('away_score')) else 0
+        }
+        processed_stats.append(stat)
+
+    return processed_stats
+
+def make_statcast_frame(rows, seed=0):
+    """Build a synthetic frame with statcast's dtypes and null patterns."""
+    rng = np.random.default_rng(seed)
+
+    def with_nans(values, rate):
+        values = values.astype('float64')
+        values[rng.random(rows) < rate] = np.nan
+        return values
+
+    def pick(choices, rate=0.0):
+        values = rng.choice(np.array(choices, dtype=object), rows)
+        if rate:
+            values[rng.random(rows) < rate] = None
+        return values
+
+    dates = pd.Timestamp('2023-04-01') + pd.to_timedelta(rng.integers(0, 180, rows), unit='D')
+    return pd.DataFrame({
+        'pitch_type': pick(PITCH_TYPES),
+        'game_date': dates,
+        'release_speed': with_nans(rng.normal(90, 5, rows).round(1), 0.01),
+        'player_name': pick([f'Player, {i}' for i in range(800)]),
+        'events': pick(EVENTS, rate=0.75),
+        'description': pick(DESCRIPTIONS),
+        'zone': with_nans(rng.integers(1, 15, rows), 0.01),
+        'stand': pick(['L', 'R']),
+        'home_team': pick(TEAMS),
+        'away_team': pick(TEAMS),
+        'type': pick(['S', 'B', 'X']),
+        'balls': rng.integers(0, 4, rows),
+        'strikes': rng.integers(0, 3, rows),
+        'hit_distance_sc': with_nans(rng.integers(0, 450, rows), 0.7),
+        'launch_speed': with_nans(rng.normal(88, 12, rows).round(1), 0.6),
+        'effective_speed': with_nans(rng.normal(89, 5, rows).round(1), 0.02),
+        'inning': rng.integers(1, 10, rows),
+        'home_score': rng.integers(0, 12, rows),
+        'away_score': rng.integers(0, 12, rows),
+    })
+
+def time_call(func, data):
+    start = time.perf_counter()
+    result = func(data)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'iterrows (s)':>14} {'columnar (s)':>14} {'speedup':>9}  output")
+    for rows in args.sizes:
+        data = make_statcast_frame(rows)
+        legacy_time, legacy = time_call(process_baseball_stats_iterrows, data)
+        columnar_time, columnar = time_call(process_baseball_stats, data)
+        same = json.dumps(legacy) == json.dumps(columnar)
+        print(f"{rows:>10} {legacy_time:>14.3f} {columnar_time:>14.3f} "
+              f"{legacy_time / columnar_time:>8.1f}x  {'identical' if same else 'MISMATCH'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# The ~20 statcast columns the endpoints actually read, out of ~90
+COMPACT_DTYPES = {
+    'game_date': 'datetime64[ns]',
+    'game_pk': 'Int32',
+    'at_bat_number': 'Int16',
+    'pitch_number': 'Int8',
+    'pitcher': 'Int32',
+    'batter': 'Int32',
+    'player_name': 'category',
+    'pitch_type': 'category',
+    'type': 'category',
+    'events': 'category',
+    'description': 'category',
+    'stand': 'category',
+    'home_team': 'category',
+    'away_team': 'category',
+    'release_speed': 'float32',
+    'effective_speed': 'float32',
+    'hit_distance_sc': 'float32',
+    'launch_speed': 'float32',
+    # Nullable small ints: statcast occasionally leaves these blank
+    'zone': 'Int8',
+    'balls': 'Int8',
+    'strikes': 'Int8',
+    'inning': 'Int8',
+    'home_score': 'Int16',
+    'away_score': 'Int16',
+}
+
+COMPACT_COLUMNS = list(COMPACT_DTYPES)
+
+def _cast(col, dtype):
+    if dtype.startswith(('Int', 'float')):
+        col = pd.to_numeric(col)
+        if dtype.startswith('Int'):
+            # Nullable ints refuse fractional floats; statcast ints are whole
+            col = col.round()
+    return col.astype(dtype)
+
+def compact_statcast(frame):
+    """Project a statcast frame to COMPACT_COLUMNS with small dtypes.
+
+    Repeated strings become categoricals and numeric fields are downcast to
+    float32 / Int8 / Int16 / Int32, cutting a frame's memory several-fold.
+    """
+    if frame is None or frame.empty:
+        return frame
+    columns = [col for col in COMPACT_COLUMNS if col in frame.columns]
+    return pd.DataFrame({
+        col: _cast(frame[col], COMPACT_DTYPES[col]) for col in columns
+    })
+
+def concat_compact(frames):
+    """Concatenate compact frames without losing their categoricals.
+
+    pd.concat falls back to object dtype when category sets differ between
+    frames, so align every categorical column on the union of categories.
+    """
+    # Shallow copies: partitions may be shared with other requests
+    frames = [frame.copy(deep=False) for frame in frames]
+    if not frames:
+        return pd.DataFrame()
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            parts = [frame[col] for frame in frames if col in frame.columns]
+            categories = union_categoricals(parts, ignore_order=True).categories
+            for frame in frames:
+                if col in frame.columns:
+                    frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
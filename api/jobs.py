@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from statcast_store import PartitionView, date_range, to_date
+
+# Background workers shared by every job
+JOB_WORKERS = 2
+
+# Queued + running jobs allowed at once; more are rejected
+MAX_ACTIVE_JOBS = 16
+
+# Finished jobs (and their results) are dropped after this many seconds
+JOB_RESULT_TTL = 15 * 60
+
+# Days backfilled per step; cancellation is checked between steps
+JOB_STEP_DAYS = 7
+
+class TooManyJobs(Exception):
+    pass
+
+class Job:
+    """One asynchronous statcast range query."""
+
+    def __init__(self, start_date, end_date):
+        self.id = uuid.uuid4().hex
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status = 'queued'
+        self.error = None
+        self.days_total = len(date_range(start_date, end_date))
+        self.days_done = 0
+        self.total_records = None
+        self.view = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self.cancel_requested = threading.Event()
+        # Bumped on every change so streaming clients can wait for the next one
+        self.version = 0
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            if self.finished and self.finished_at is None:
+                self.finished_at = time.time()
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout):
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'progress': {
+                'days_done': self.days_done,
+                'days_total': self.days_total
+            },
+            'total_records': self.total_records,
+            'error': self.error
+        }
+
+class JobManager:
+    """Runs long range queries on a bounded executor with expiring results."""
+
+    def __init__(self, store, workers=JOB_WORKERS, max_active=MAX_ACTIVE_JOBS, ttl=JOB_RESULT_TTL):
+        self.store = store
+        self.max_active = max_active
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='statcast-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.ttl:
+                del self._jobs[job_id]
+
+    def submit(self, start_date, end_date):
+        with self._lock:
+            self._expire()
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self.max_active:
+                raise TooManyJobs(f'{active} jobs already queued or running')
+            job = Job(start_date, end_date)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested.set()
+        # Queued jobs never start; running ones stop at the next step
+        if job.future is not None and job.future.cancel():
+            job.update(status='cancelled')
+        return job
+
+    def _run(self, job):
+        job.update(status='running')
+        try:
+            start, end = to_date(job.start_date), to_date(job.end_date)
+            recent = {}
+            step_start = start
+            while step_start <= end:
+                if job.cancel_requested.is_set():
+                    job.update(status='cancelled')
+                    return
+                step_end = min(step_start + timedelta(days=JOB_STEP_DAYS - 1), end)
+                recent.update(self.store.backfill(
+                    step_start, step_end,
+                    progress=lambda days: job.update(days_done=job.days_done + days)
+                ))
+                # Cached days never report progress, so snap to the step end
+                job.update(days_done=(step_end - start).days + 1)
+                step_start = step_end + timedelta(days=1)
+
+            view = PartitionView(self.store, date_range(start, end), recent)
+            job.update(status='done', view=view, total_records=view.total_rows())
+        except Exception as e:
+            print(f"Job {job.id} failed: {str(e)}")
+            job.update(status='failed', error=str(e))
@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import date
+
+from processing import iter_processed_chunks, process_baseball_stats
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+# Rows converted and serialized per NDJSON write
+STREAM_CHUNK_ROWS = 5000
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(day, offset):
+    """Opaque cursor pointing at a row offset within one date partition."""
+    payload = json.dumps({'d': day.isoformat(), 'o': offset}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        day, offset = date.fromisoformat(payload['d']), payload['o']
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {cursor}') from e
+    # bool is an int subclass; neither it nor a negative offset points at a row
+    if type(offset) is not int or offset < 0:
+        raise InvalidCursor(f'Invalid cursor: {cursor}')
+    return day, offset
+
+def paginate(view, limit, cursor=None):
+    """Return one page of processed rows and the cursor for the next page.
+
+    Partitions before the cursor are skipped by row count alone, so a page
+    only ever reads the partitions it returns rows from.
+    """
+    start_day, start_offset = decode_cursor(cursor) if cursor else (None, 0)
+    rows = []
+
+    for index, day in enumerate(view.days):
+        # Days are newest first, so anything newer than the cursor is done
+        if start_day is not None and day > start_day:
+            continue
+        offset = start_offset if day == start_day else 0
+        available = view.row_count(day) - offset
+        if available <= 0:
+            continue
+
+        take = min(available, limit - len(rows))
+        frame = view.read(day)
+        rows.extend(process_baseball_stats(frame.iloc[offset:offset + take]))
+
+        if len(rows) == limit:
+            if take < available:
+                return rows, encode_cursor(day, offset + take)
+            if index + 1 < len(view.days):
+                return rows, encode_cursor(view.days[index + 1], 0)
+            return rows, None
+
+    return rows, None
+
+def stream_ndjson(view, metadata, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield NDJSON text: a metadata line followed by one line per row."""
+    yield json.dumps({'metadata': metadata}) + '\n'
+    for _, frame in view.iter_partitions():
+        for chunk in iter_processed_chunks(frame, chunk_rows):
+            yield ''.join(json.dumps(row) + '\n' for row in chunk)
@@ -0,0 +1,160 @@
+import threading
+import time
+
+import pandas as pd
+
+from processing import as_float64
+
+HIT_EVENTS = ['single', 'double', 'triple', 'home_run']
+
+# Columns the index reads from each partition
+INDEX_COLUMNS = [
+    'player_name', 'pitcher', 'release_speed', 'type', 'events', 'hit_distance_sc', 'launch_speed'
+]
+
+# Additive per-(player, day) partials; means are derived as sum / count so
+# any set of days can be combined by summing
+PARTIAL_COLUMNS = [
+    'games', 'pitches', 'strikes', 'balls', 'hits',
+    'speed_sum', 'speed_n', 'distance_sum', 'distance_n', 'launch_sum', 'launch_n',
+]
+
+def daily_partials(frame):
+    """One groupby pass over a single day's pitches, indexed by player_name."""
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=PARTIAL_COLUMNS, dtype='float64')
+
+    pitch_type = frame['type']
+    work = pd.DataFrame({
+        'player_name': frame['player_name'],
+        'pitches': 1,
+        'strikes': (pitch_type == 'S').astype('int64'),
+        'balls': (pitch_type == 'B').astype('int64'),
+        'hits': frame['events'].isin(HIT_EVENTS).astype('int64'),
+        'speed_sum': as_float64(frame['release_speed']).fillna(0),
+        'speed_n': frame['release_speed'].notna().astype('int64'),
+        'distance_sum': as_float64(frame['hit_distance_sc']).fillna(0),
+        'distance_n': frame['hit_distance_sc'].notna().astype('int64'),
+        'launch_sum': as_float64(frame['launch_speed']).fillna(0),
+        'launch_n': frame['launch_speed'].notna().astype('int64'),
+    })
+    partials = work.groupby('player_name', observed=True, sort=False).sum()
+    # Plain index: categorical ones from different days do not combine cleanly
+    partials.index = partials.index.astype(object)
+    # Each partial covers one date, so a player present that day played one game
+    partials['games'] = 1
+    return partials[PARTIAL_COLUMNS].astype('float64')
+
+def day_fingerprint(frame):
+    """Row count plus a content hash of the indexed columns, to spot re-fetched days that changed."""
+    if frame is None or frame.empty:
+        return (0, 0)
+    columns = [col for col in INDEX_COLUMNS if col in frame.columns]
+    return (len(frame), int(pd.util.hash_pandas_object(frame[columns], index=False).sum()))
+
+def _mean(total, count):
+    return total / count if count else float('nan')
+
+def stats_from_totals(player_name, totals):
+    """Shape one row of summed partials like the /api/player-stats response."""
+    return {
+        'player_name': player_name,
+        'games_played': int(totals['games']),
+        'avg_pitch_speed': _mean(totals['speed_sum'], totals['speed_n']),
+        'total_pitches': int(totals['pitches']),
+        'strikes': int(totals['strikes']),
+        'balls': int(totals['balls']),
+        'hit_stats': {
+            'avg_hit_distance': _mean(totals['distance_sum'], totals['distance_n']),
+            'avg_launch_speed': _mean(totals['launch_sum'], totals['launch_n']),
+            'total_hits': int(totals['hits'])
+        }
+    }
+
+class PlayerStatsIndex:
+    """player_name -> aggregate stats over a sliding window of dates.
+
+    Keeps per-day partials so a refresh only groups the days that are new or
+    whose (unsettled) content changed, then recomputes the stats of the
+    players on those days. Lookups are a dict access.
+    """
+
+    def __init__(self):
+        self._daily = {}
+        self._fingerprints = {}
+        # What the last refresh covered, so callers can skip fresh ones
+        self.window = None
+        self.refreshed_at = 0.0
+        self._stats = {}
+        # statcast's player_name is the pitcher, so MLBAM ids come from there
+        self._names_by_id = {}
+        self._lock = threading.Lock()
+
+    def is_fresh(self, window, max_age):
+        return self.window == window and time.time() - self.refreshed_at < max_age
+
+    def refresh(self, view, window=None):
+        """Bring the index in line with a store PartitionView covering window.
+
+        Days that left the window are dropped, days that are new or unsettled
+        with different content are grouped, and only the players appearing on
+        those days get their totals recomputed.
+        """
+        with self._lock:
+            days = set(view.days)
+            dropped = [day for day in self._daily if day not in days]
+            changed = [
+                day for day in view.days
+                if day not in self._daily
+                or (day in view.recent and day_fingerprint(view.recent[day]) != self._fingerprints.get(day))
+            ]
+            self.window, self.refreshed_at = window, time.time()
+            if not dropped and not changed:
+                return
+
+            touched = set()
+            for day in dropped + changed:
+                self._fingerprints.pop(day, None)
+                if day in self._daily:
+                    touched.update(self._daily.pop(day).index)
+            for day in changed:
+                frame = view.read(day, columns=INDEX_COLUMNS)
+                partials = daily_partials(frame)
+                self._daily[day] = partials
+                if day in view.recent:
+                    self._fingerprints[day] = day_fingerprint(frame)
+                touched.update(partials.index)
+                if frame is not None and 'pitcher' in frame.columns:
+                    ids = frame[['pitcher', 'player_name']].dropna().drop_duplicates('pitcher')
+                    self._names_by_id.update(zip(ids['pitcher'].astype('int64'), ids['player_name']))
+
+            # Re-sum from the daily partials rather than adding deltas so
+            # float sums never drift across refreshes
+            touched_index = pd.Index(list(touched))
+            parts = [partials.loc[partials.index.intersection(touched_index)] for partials in self._daily.values()]
+            parts = [part for part in parts if not part.empty]
+            totals = pd.concat(parts).groupby(level=0).sum() if parts else None
+
+            stats = dict(self._stats)
+            for player_name in touched:
+                if totals is not None and player_name in totals.index:
+                    stats[player_name] = stats_from_totals(player_name, totals.loc[player_name])
+                else:
+                    stats.pop(player_name, None)
+            self._stats = stats
+
+    def get(self, player_name):
+        return self._stats.get(player_name)
+
+    def get_by_id(self, player_id):
+        player_name = self._names_by_id.get(int(player_id))
+        return self._stats.get(player_name) if player_name is not None else None
+
+    def lookup(self, player):
+        """Resolve a player_name or an MLBAM id (int or digit string)."""
+        if (isinstance(player, int) and not isinstance(player, bool)) or (isinstance(player, str) and player.isdigit()):
+            return self.get_by_id(player)
+        return self.get(player)
+
+    def __len__(self):
+        return len(self._stats)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+# Output field -> (source column, kind, value used for NaN/missing).
+# Kinds mirror the per-row casts the API has always applied:
+#   'date'  -> 'YYYY-MM-DD' string
+#   'str'   -> raw value, NaN becomes None
+#   'float' -> float()
+#   'int'   -> int() (truncates toward zero)
+STAT_FIELDS = [
+    ('game_date', 'game_date', 'date', None),
+    ('player_name', 'player_name', 'str', None),
+    ('pitch_type', 'pitch_type', 'str', None),
+    ('release_speed', 'release_speed', 'float', None),
+    ('effective_speed', 'effective_speed', 'float', None),
+    ('strikes', 'strikes', 'int', 0),
+    ('balls', 'balls', 'int', 0),
+    ('inning', 'inning', 'int', 0),
+    ('stand', 'stand', 'str', None),
+    ('hit_distance_sc', 'hit_distance_sc', 'float', None),
+    ('hit_speed', 'launch_speed', 'float', None),
+    ('events', 'events', 'str', None),
+    ('description', 'description', 'str', None),
+    ('zone', 'zone', 'int', None),
+    ('home_team', 'home_team', 'str', None),
+    ('away_team', 'away_team', 'str', None),
+    ('home_score', 'home_score', 'int', 0),
+    ('away_score', 'away_score', 'int', 0),
+]
+
+# Significant decimal digits a float32 holds exactly
+FLOAT32_DIGITS = 7
+
+def as_float64(col):
+    """Widen a numeric column to float64.
+
+    float32 is rounded to FLOAT32_DIGITS significant digits so compact frames
+    yield the same values as the original float64 data (95.4, not
+    95.40000152587891). Scaling by an exact power of ten and rounding keeps
+    this vectorized.
+    """
+    if col.dtype == 'float32':
+        values = col.to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            magnitude = np.floor(np.log10(np.abs(values)))
+        digits = np.where(np.isfinite(magnitude), FLOAT32_DIGITS - 1 - magnitude, 0)
+        scale = 10.0 ** np.abs(digits)
+        rounded = np.where(digits >= 0, np.round(values * scale) / scale, np.round(values / scale) * scale)
+        return pd.Series(rounded, index=col.index)
+    return pd.to_numeric(col).astype('float64')
+
+def _fill(values, mask, default):
+    # Cast to object so tolist() hands back plain Python scalars, then
+    # patch the null slots with the field default
+    values = values.to_numpy(dtype=object)
+    values[mask.to_numpy()] = default
+    return values.tolist()
+
+def _column_values(data, column, kind, default):
+    if column not in data.columns:
+        # A missing string column used to come through row.get(col, '')
+        # untouched; every other kind fell back to its default
+        return [('' if kind == 'str' else default)] * len(data)
+
+    col = data[column]
+    mask = col.isna()
+
+    if kind == 'date':
+        formatted = pd.to_datetime(col).dt.strftime('%Y-%m-%d')
+        return _fill(formatted, mask, default)
+    if kind == 'float':
+        return _fill(as_float64(col), mask, default)
+    if kind == 'int':
+        numeric = as_float64(col).fillna(0)
+        return _fill(numeric.astype('int64'), mask, default)
+    return _fill(col, mask, default)
+
+def process_baseball_stats(data):
+    """Convert a statcast frame into the list of dicts served by the API.
+
+    Conversion runs once per column instead of once per row, so the cost is
+    dominated by building the output dicts rather than by pandas row access.
+    """
+    if data is None or len(data) == 0:
+        return []
+
+    names = [field for field, _, _, _ in STAT_FIELDS]
+    columns = [
+        _column_values(data, column, kind, default)
+        for _, column, kind, default in STAT_FIELDS
+    ]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+def iter_processed_chunks(frame, chunk_rows):
+    """Yield process_baseball_stats output for consecutive row slices.
+
+    Lets callers stream a large frame without materializing every dict.
+    """
+    for offset in range(0, len(frame), chunk_rows):
+        yield process_baseball_stats(frame.iloc[offset:offset + chunk_rows])
@@ -0,0 +1,361 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pyarrow.parquet as pq
+from pybaseball import statcast
+
+from compact import COMPACT_COLUMNS, compact_statcast, concat_compact
+
+# Where partitions live; one Parquet file per game date
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'statcast')
+
+# Statcast keeps correcting the last couple of days (late games, scoring
+# changes), so only dates older than this are treated as final
+SETTLED_AFTER_DAYS = 3
+
+# Unsettled dates are kept in memory for this long, so repeat requests for
+# "the last N days" do not download them again every time
+RECENT_TTL_SECONDS = int(os.getenv('STATCAST_RECENT_TTL', '300'))
+
+# Cold ranges are downloaded as chunks of this many days, several at a time
+FETCH_CHUNK_DAYS = 1
+FETCH_WORKERS = 6
+
+# Per-chunk retries with exponential backoff (seconds)
+FETCH_RETRIES = 2
+FETCH_RETRY_BACKOFF = 1.0
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def date_range(start_date, end_date):
+    """Every calendar date from start_date to end_date inclusive."""
+    start, end = to_date(start_date), to_date(end_date)
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+def contiguous_runs(dates):
+    """Group sorted dates into (first, last) runs of consecutive days."""
+    runs = []
+    for day in sorted(dates):
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [(first, last) for first, last in runs]
+
+def chunk_range(first, last, chunk_days):
+    """Split first..last into consecutive (start, end) chunks of chunk_days."""
+    chunks = []
+    start = first
+    while start <= last:
+        end = min(start + timedelta(days=chunk_days - 1), last)
+        chunks.append((start, end))
+        start = end + timedelta(days=1)
+    return chunks
+
+def read_partition_file(path, columns=None, compact=False):
+    """Read one partition file; module level so worker processes can use it."""
+    if compact:
+        # Partitions written before compact mode still hold every column
+        columns = [col for col in (columns or COMPACT_COLUMNS) if col in COMPACT_COLUMNS]
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [col for col in columns if col in available]
+    frame = pd.read_parquet(path, columns=columns)
+    if 'game_date' in frame.columns:
+        frame['game_date'] = pd.to_datetime(frame['game_date'])
+    return compact_statcast(frame) if compact else frame
+
+class _Flight:
+    """One in-flight statcast download covering first..last inclusive."""
+
+    def __init__(self, first, last):
+        self.first = first
+        self.last = last
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def covers(self, day):
+        return self.first <= day <= self.last
+
+class StatcastStore:
+    """Local statcast cache split into one Parquet partition per game date.
+
+    Settled dates are written to disk once and never downloaded again. Dates
+    that may still change are not persisted; they are kept in memory for
+    recent_ttl seconds and downloaded again after that. Missing dates are
+    downloaded as per-day chunks on a bounded worker pool.
+
+    In compact mode (the default, STATCAST_COMPACT=0 to disable) frames are
+    projected to the columns the API uses and stored with categorical and
+    downcast numeric dtypes, both on disk and in memory.
+    """
+
+    def __init__(self, root=None, fetch=statcast, settled_after_days=SETTLED_AFTER_DAYS, compact=None,
+                 fetch_workers=FETCH_WORKERS, chunk_days=FETCH_CHUNK_DAYS, recent_ttl=RECENT_TTL_SECONDS):
+        self.root = root or os.getenv('STATCAST_STORE_DIR', DEFAULT_STORE_DIR)
+        if compact is None:
+            compact = os.getenv('STATCAST_COMPACT', '1') != '0'
+        self.compact = compact
+        self.fetch = fetch
+        self.settled_after_days = settled_after_days
+        self.chunk_days = chunk_days
+        self.recent_ttl = recent_ttl
+        # Unsettled date -> (frame or None for no games, fetched at)
+        self._recent = {}
+        self._recent_lock = threading.Lock()
+        # Shared by every request so total upstream concurrency stays bounded
+        self._fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix='statcast-fetch')
+        self._flights = []
+        self._flights_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def partition_path(self, day):
+        return os.path.join(self.root, f'{day.isoformat()}.parquet')
+
+    def empty_marker_path(self, day):
+        # Off days (no games) get a marker so they are not fetched again
+        return os.path.join(self.root, f'{day.isoformat()}.empty')
+
+    def is_settled(self, day):
+        return day <= date.today() - timedelta(days=self.settled_after_days)
+
+    def has_partition(self, day):
+        if not self.is_settled(day):
+            return self.cached_recent(day) is not None
+        return os.path.exists(self.partition_path(day)) or os.path.exists(self.empty_marker_path(day))
+
+    def cached_recent(self, day):
+        """(frame, fetched_at) for an unsettled date still within its TTL, else None"""
+        with self._recent_lock:
+            entry = self._recent.get(day)
+            if entry is not None and time.time() - entry[1] >= self.recent_ttl:
+                del self._recent[day]
+                entry = None
+            return entry
+
+    def cache_recent(self, day, frame):
+        if self.recent_ttl <= 0:
+            return
+        now = time.time()
+        with self._recent_lock:
+            self._recent[day] = (frame, now)
+            for stale in [d for d, (_, fetched_at) in self._recent.items() if now - fetched_at >= self.recent_ttl]:
+                del self._recent[stale]
+
+    def missing_dates(self, start_date, end_date):
+        return [day for day in date_range(start_date, end_date) if not self.has_partition(day)]
+
+    def read_partition(self, day, columns=None):
+        path = self.partition_path(day)
+        if not os.path.exists(path):
+            return None
+        return read_partition_file(path, columns, self.compact)
+
+    def write_partition(self, day, frame):
+        if frame is None or frame.empty:
+            open(self.empty_marker_path(day), 'w').close()
+            return
+        path = self.partition_path(day)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        frame.reset_index(drop=True).to_parquet(tmp_path, index=False)
+        # Atomic swap so concurrent readers never see a half-written file
+        os.replace(tmp_path, path)
+
+    def _split_by_date(self, data, first, last):
+        """Split a fetched run into per-date frames, including empty off days."""
+        if data is None or data.empty:
+            return {day: None for day in date_range(first, last)}
+        game_dates = pd.to_datetime(data['game_date']).dt.date
+        return {day: data[game_dates == day] for day in date_range(first, last)}
+
+    def _fetch_chunk(self, first, last):
+        for attempt in range(FETCH_RETRIES + 1):
+            try:
+                data = self.fetch(start_dt=first.isoformat(), end_dt=last.isoformat())
+                break
+            except Exception as e:
+                if attempt == FETCH_RETRIES:
+                    raise
+                delay = FETCH_RETRY_BACKOFF * 2 ** attempt
+                print(f"Statcast chunk {first} to {last} failed ({str(e)}), retrying in {delay}s")
+                time.sleep(delay)
+        if self.compact:
+            data = compact_statcast(data)
+        return self._split_by_date(data, first, last)
+
+    def _fetch_run(self, first, last, on_chunk):
+        """Download first..last as parallel chunks, each retried on its own.
+
+        on_chunk is called with each chunk's per-date frames as it lands.
+        Returns every date's frame in date order, or raises the first chunk
+        error once all chunks have finished.
+        """
+        chunks = chunk_range(first, last, self.chunk_days)
+        print(f"Fetching statcast {first} to {last} in {len(chunks)} chunks")
+        futures = {self._fetch_pool.submit(self._fetch_chunk, *chunk): chunk for chunk in chunks}
+
+        frames = {}
+        errors = []
+        for done, future in enumerate(as_completed(futures), start=1):
+            chunk_first, chunk_last = futures[future]
+            try:
+                chunk_frames = future.result()
+            except Exception as e:
+                print(f"Statcast chunk {chunk_first} to {chunk_last} failed: {str(e)}")
+                errors.append(e)
+                continue
+            frames.update(chunk_frames)
+            on_chunk(chunk_frames)
+            print(f"Fetched statcast chunk {chunk_first} to {chunk_last} ({done}/{len(chunks)})")
+
+        if errors:
+            raise errors[0]
+        return {day: frames[day] for day in date_range(first, last)}
+
+    def _run_flight(self, flight, progress=None):
+        def on_chunk(chunk_frames):
+            # Persist each chunk as it lands so a failed run keeps the rest
+            # and a later request only re-downloads the failed chunks; this
+            # also happens before waiters wake, so they find it on disk
+            for day, frame in chunk_frames.items():
+                if self.is_settled(day):
+                    self.write_partition(day, frame)
+                else:
+                    self.cache_recent(day, frame)
+            if progress is not None:
+                progress(len(chunk_frames))
+
+        try:
+            flight.result = self._fetch_run(flight.first, flight.last, on_chunk)
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._flights_lock:
+                self._flights.remove(flight)
+            flight.done.set()
+
+    def backfill(self, start_date, end_date, progress=None):
+        """Download missing dates and persist the settled ones.
+
+        Concurrent callers are coalesced: dates already covered by another
+        request's in-flight fetch are waited on and shared rather than
+        downloaded again, so N overlapping requests cost one upstream call.
+
+        progress, if given, is called with a day count as each chunk of this
+        request's own downloads lands and as each shared download completes.
+
+        Returns the unsettled frames keyed by date; those are never written,
+        only cached for recent_ttl, so the caller has to hold on to them for
+        the rest of the request.
+        """
+        joined = {}
+        with self._flights_lock:
+            # Plan under the lock so a flight finishing in between cannot
+            # make us re-download dates it just wrote
+            own = []
+            for day in self.missing_dates(start_date, end_date):
+                flight = next((f for f in self._flights if f.covers(day)), None)
+                if flight is None:
+                    own.append(day)
+                else:
+                    joined.setdefault(flight, []).append(day)
+            own_flights = [_Flight(first, last) for first, last in contiguous_runs(own)]
+            self._flights.extend(own_flights)
+
+        # Every flight we registered must run, even after an error, or the
+        # requests waiting on it would block forever
+        for flight in own_flights:
+            self._run_flight(flight, progress)
+
+        for flight, days in joined.items():
+            flight.done.wait()
+            if progress is not None:
+                progress(len(days))
+
+        recent = {}
+        fetched = set()
+        shared = list(joined.items())
+        owned = [(flight, date_range(flight.first, flight.last)) for flight in own_flights]
+        for flight, days in owned + shared:
+            if flight.error is not None:
+                raise flight.error
+            for day in days:
+                fetched.add(day)
+                frame = flight.result[day]
+                if not self.is_settled(day) and frame is not None and not frame.empty:
+                    recent[day] = frame
+        # Unsettled dates that were still cached from an earlier request
+        for day in date_range(start_date, end_date):
+            if day in fetched or self.is_settled(day):
+                continue
+            entry = self.cached_recent(day)
+            if entry is not None and entry[0] is not None and not entry[0].empty:
+                recent[day] = entry[0]
+        return recent
+
+    def view(self, start_date, end_date):
+        """Backfill a date range and return a PartitionView over it."""
+        recent = self.backfill(start_date, end_date)
+        return PartitionView(self, date_range(start_date, end_date), recent)
+
+    def iter_partitions(self, start_date, end_date, columns=None):
+        """Yield (date, frame) for each non-empty date, newest first."""
+        return self.view(start_date, end_date).iter_partitions(columns)
+
+    def load(self, start_date, end_date, columns=None):
+        """Return the statcast frame for a date range, newest date first.
+
+        Matches the ordering pybaseball's statcast() returns.
+        """
+        frames = [frame for _, frame in self.iter_partitions(start_date, end_date, columns)]
+        if not frames:
+            return pd.DataFrame()
+        if self.compact:
+            return concat_compact(frames)
+        return pd.concat(frames, ignore_index=True)
+
+class PartitionView:
+    """The partitions covering one date range after backfill, newest first.
+
+    Frames are read lazily one date at a time, so walking a view keeps at
+    most one partition (plus the unsettled recent days) in memory.
+    """
+
+    def __init__(self, store, days, recent):
+        self.store = store
+        self.recent = recent
+        self.days = [
+            day for day in reversed(days)
+            if day in recent or os.path.exists(store.partition_path(day))
+        ]
+
+    def row_count(self, day):
+        if day in self.recent:
+            return len(self.recent[day])
+        # Parquet footers carry the row count, no need to read the data
+        return pq.ParquetFile(self.store.partition_path(day)).metadata.num_rows
+
+    def total_rows(self):
+        return sum(self.row_count(day) for day in self.days)
+
+    def read(self, day, columns=None):
+        if day in self.recent:
+            frame = self.recent[day]
+            if columns is not None:
+                frame = frame[[col for col in columns if col in frame.columns]]
+            return frame
+        return self.store.read_partition(day, columns=columns)
+
+    def iter_partitions(self, columns=None):
+        for day in self.days:
+            yield day, self.read(day, columns)
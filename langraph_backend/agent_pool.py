@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("MLB_Agent")
+
+# Workflows executing at once; each holds a thread blocked on Gemini/MLB calls
+AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "8"))
+
+# Requests allowed to wait for a worker; beyond this they are rejected
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "32"))
+
+# Recent queue waits kept for the wait-time percentiles
+WAIT_SAMPLES = 500
+
+class PoolFull(Exception):
+    pass
+
+class _Ticket:
+    def __init__(self, on_position, is_cancelled):
+        self.on_position = on_position
+        self.is_cancelled = is_cancelled
+        self.enqueued_at = time.monotonic()
+
+class AgentPool:
+    """Bounded executor for agent workflows with admission control.
+
+    At most max_workers workflows run at once and at most max_queue wait in
+    FIFO order; submit() raises PoolFull beyond that so the caller can shed
+    load immediately instead of piling up threads. Waiting requests are told
+    their queue position whenever it changes, and requests whose client has
+    gone away are skipped when their turn comes.
+    """
+
+    def __init__(self, max_workers: int = AGENT_MAX_WORKERS, max_queue: int = AGENT_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-workflow")
+        self._waiting: "deque[_Ticket]" = deque()
+        self._running = 0
+        self._waits: "deque[float]" = deque(maxlen=WAIT_SAMPLES)
+        self._counts = {"accepted": 0, "rejected": 0, "completed": 0, "abandoned": 0}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], Any],
+               on_position: Optional[Callable[[int], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Future:
+        """Queue fn; on_position(n) is called with n >= 1 while it waits."""
+        ticket = _Ticket(on_position, is_cancelled)
+        with self._lock:
+            if self._running + len(self._waiting) >= self.max_workers + self.max_queue:
+                self._counts["rejected"] += 1
+                raise PoolFull(f"{self._running} running, {len(self._waiting)} queued")
+            self._counts["accepted"] += 1
+            self._waiting.append(ticket)
+            position = len(self._waiting) - (self.max_workers - self._running)
+        if position > 0 and on_position is not None:
+            on_position(position)
+        return self._executor.submit(self._run, ticket, fn)
+
+    def _run(self, ticket: _Ticket, fn: Callable[[], Any]):
+        with self._lock:
+            self._waiting.remove(ticket)
+            self._waits.append(time.monotonic() - ticket.enqueued_at)
+            self._running += 1
+            still_waiting = list(self._waiting)
+            free = self.max_workers - self._running
+        # Everyone behind this request moved up one place
+        for index, waiting in enumerate(still_waiting):
+            position = index + 1 - free
+            if position > 0 and waiting.on_position is not None:
+                waiting.on_position(position)
+        outcome = "completed"
+        try:
+            if ticket.is_cancelled is not None and ticket.is_cancelled():
+                logger.info("Skipping workflow, client left while queued")
+                outcome = "abandoned"
+                return None
+            return fn()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._counts[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": max(0, len(self._waiting) - (self.max_workers - self._running)),
+                **self._counts,
+                "wait_seconds": {
+                    "avg": sum(waits) / len(waits) if waits else 0.0,
+                    "p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                    "max": waits[-1] if waits else 0.0
+                }
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from entity_index import normalize
+
+MAX_ANSWERS = 1024
+
+# Words that do not change what is being asked
+QUESTION_STOPWORDS = {
+    "a", "an", "the", "of", "for", "in", "on", "at", "to", "me", "my", "please", "show",
+    "get", "give", "tell", "what", "whats", "s", "is", "are", "was", "were", "did", "do",
+    "does", "can", "you", "i", "about", "game", "games", "and", "with", "from", "by"
+}
+
+def question_terms(query: str, entity_names: Iterable[Optional[str]]) -> List[str]:
+    """The words of a question that carry intent, order-free.
+
+    Names of the resolved entities are dropped, since their ids are part of
+    the key anyway, so "Cubs" and "Chicago Cubs" phrase the same question.
+    """
+    names = set()
+    for name in entity_names:
+        if name:
+            names.update(normalize(name).split())
+    return sorted(set(normalize(query).split()) - QUESTION_STOPWORDS - names)
+
+def intent_key(query: str, entities: Dict[str, Any], plan: List[Dict[str, Any]]) -> str:
+    """Stable key for (question intent, resolved entities, tool plan)"""
+    names = [entities.get("player_name"), entities.get("team_name"), entities.get("opponent_name")]
+    material = {
+        "terms": question_terms(query, names),
+        "entities": {key: entities.get(key) for key in ("player_id", "team_id", "opponent_id", "game_pk")},
+        "plan": sorted(json.dumps(call, sort_keys=True, default=str) for call in plan)
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+@dataclass
+class CachedAnswer:
+    events: List[Tuple[str, Dict[str, Any]]]
+    final_answer: str
+    expires_at: Optional[float]
+
+class AnswerCache:
+    """Final answers plus the SSE events that produced them.
+
+    An entry lives as long as the freshest data it was built from: seconds
+    for a live game, hours for a roster, forever (until evicted) for a
+    final game. Replaying the recorded events makes a hit look exactly like
+    a fresh run to the client, only faster.
+    """
+
+    def __init__(self, max_entries: int = MAX_ANSWERS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedAnswer]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, events: List[Tuple[str, Dict[str, Any]]], final_answer: str, ttl: Optional[float]):
+        """Store an answer; ttl None means it never goes stale, 0 not at all"""
+        if ttl is not None and ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = CachedAnswer(
+                events=events,
+                final_answer=final_answer,
+                expires_at=None if ttl is None else time.time() + ttl
+            )
+            self._entries.move_to_end(key)
+            self._stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), **self._stats}
@@ -0,0 +1,212 @@
+import difflib
+import logging
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger("MLB_Agent")
+
+# Rebuilt in the background this often; rosters change daily at most
+ENTITY_REFRESH_SECONDS = 6 * 60 * 60
+
+# Longest alias looked up, in words ("tampa bay rays", "la angels of anaheim")
+MAX_ALIAS_WORDS = 4
+
+# difflib ratio needed for a typo match ("ohtanii", "yankes")
+FUZZY_CUTOFF = 0.88
+
+# Nicknames the API does not carry, keyed by team abbreviation
+TEAM_ALIASES = {
+    "AZ": ["dbacks", "d backs", "snakes"],
+    "ATL": ["bravos"],
+    "BOS": ["bosox"],
+    "CHC": ["cubbies", "north siders"],
+    "CWS": ["chisox", "south siders"],
+    "LAA": ["halos"],
+    "LAD": ["la dodgers", "boys in blue"],
+    "NYM": ["amazins", "metropolitans"],
+    "NYY": ["yanks", "bronx bombers", "ny yankees"],
+    "OAK": ["oakland as"],
+    "PHI": ["phils"],
+    "SD": ["friars"],
+    "SF": ["gigantes"],
+    "STL": ["cards", "redbirds"],
+    "TOR": ["jays"],
+    "WSH": ["nats"],
+}
+
+# Surnames that are also ordinary words in questions; never matched alone
+COMMON_WORDS = {
+    "will", "may", "king", "strong", "young", "rich", "hope", "best", "long",
+    "black", "white", "brown", "green", "gray", "bell", "cash", "price", "game",
+    "miller", "mercado", "garcia", "smith", "rodriguez", "martinez", "hernandez"
+}
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation: 'Acuña Jr.' -> 'acuna jr'"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"['’.]", "", text)
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+def _ngrams(words: List[str]):
+    """Every span of up to MAX_ALIAS_WORDS words, longest first"""
+    for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            yield start, size, " ".join(words[start:start + size])
+
+class _AliasTable:
+    def __init__(self):
+        self.ids: Dict[str, Set[int]] = defaultdict(set)
+        # Aliases bucketed by first letter keep fuzzy matching cheap
+        self.buckets: Dict[str, List[str]] = defaultdict(list)
+
+    def add(self, alias: Optional[str], entity_id: int):
+        key = normalize(alias or "")
+        if not key:
+            return
+        if key not in self.ids:
+            self.buckets[key[0]].append(key)
+        self.ids[key].add(entity_id)
+
+    def exact(self, key: str) -> Optional[int]:
+        ids = self.ids.get(key)
+        return next(iter(ids)) if ids and len(ids) == 1 else None
+
+    def fuzzy(self, key: str) -> Optional[int]:
+        # Short words are too often ordinary words one letter off a surname
+        if len(key) < 6:
+            return None
+        close = difflib.get_close_matches(key, self.buckets.get(key[0], []), n=1, cutoff=FUZZY_CUTOFF)
+        return self.exact(close[0]) if close else None
+
+class EntityIndex:
+    """In-memory names -> ids for active players and MLB teams.
+
+    Built from the teams and sport players endpoints plus local nickname
+    tables, then kept current by a background thread. Lookups scan the
+    query's word n-grams, longest first, against accent- and punctuation-
+    insensitive aliases, falling back to difflib for near misses. Aliases
+    shared by several players (common surnames) are only matched in full.
+    """
+
+    def __init__(self, fetch: Callable[[str, Dict[str, Any]], dict], base_url: str,
+                 refresh_seconds: float = ENTITY_REFRESH_SECONDS):
+        self.fetch = fetch
+        self.base_url = base_url
+        self.refresh_seconds = refresh_seconds
+        self.players: Dict[int, Dict[str, Any]] = {}
+        self.teams: Dict[int, Dict[str, Any]] = {}
+        self._player_aliases = _AliasTable()
+        self._team_aliases = _AliasTable()
+        self.loaded_at: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def refresh(self, season: Optional[int] = None):
+        season = season or datetime.now().year
+        teams_doc = self.fetch(f"{self.base_url}/teams", {"sportId": 1, "season": season})
+        players_doc = self.fetch(f"{self.base_url}/sports/1/players", {"season": season})
+
+        teams, team_aliases = {}, _AliasTable()
+        locations = defaultdict(set)
+        for team in teams_doc.get("teams", []):
+            team_id = team["id"]
+            teams[team_id] = {"id": team_id, "name": team.get("name"), "abbreviation": team.get("abbreviation")}
+            for field in ("name", "teamName", "clubName", "shortName", "franchiseName", "abbreviation"):
+                team_aliases.add(team.get(field), team_id)
+            for alias in TEAM_ALIASES.get(team.get("abbreviation"), []):
+                team_aliases.add(alias, team_id)
+            locations[normalize(team.get("locationName") or "")].add(team_id)
+        # A city names a team only where it has one ("Houston", not "Chicago")
+        for location, ids in locations.items():
+            if location and len(ids) == 1:
+                team_aliases.add(location, next(iter(ids)))
+
+        players, player_aliases = {}, _AliasTable()
+        for person in players_doc.get("people", []):
+            player_id = person["id"]
+            players[player_id] = {
+                "id": player_id,
+                "name": person.get("fullName"),
+                "team_id": person.get("currentTeam", {}).get("id")
+            }
+            for field in ("fullName", "nameFirstLast", "firstLastName", "nickName"):
+                player_aliases.add(person.get(field), player_id)
+            if person.get("useName") and person.get("lastName"):
+                player_aliases.add(f"{person['useName']} {person['lastName']}", player_id)
+            last_name = normalize(person.get("lastName") or "")
+            if len(last_name) >= 4 and last_name not in COMMON_WORDS:
+                player_aliases.add(last_name, player_id)
+
+        # Swap everything at once so readers never see a half-built index
+        self.teams, self._team_aliases = teams, team_aliases
+        self.players, self._player_aliases = players, player_aliases
+        self.loaded_at = datetime.now()
+        logger.info(f"Entity index loaded: {len(teams)} teams, {len(players)} players")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Entity index refresh failed: {str(e)}")
+            self._stop.wait(self.refresh_seconds if self.ready else 60)
+
+    def start(self):
+        """Load, then keep refreshing, on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="entity-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _match(self, words: List[str], lookup, taken: Set[int],
+               exclude: Optional[int] = None) -> Tuple[Optional[int], Set[int]]:
+        for start, size, key in _ngrams(words):
+            positions = set(range(start, start + size))
+            if positions & taken:
+                continue
+            entity_id = lookup(key)
+            if entity_id is not None and entity_id != exclude:
+                return entity_id, positions
+        return None, set()
+
+    def resolve(self, query: str) -> Dict[str, Any]:
+        """Player, team and opponent team mentioned in query (None if absent)"""
+        words = normalize(query).split()
+        found: Dict[str, int] = {}
+        taken: Set[int] = set()
+        kinds = (
+            ("player", self._player_aliases),
+            ("team", self._team_aliases),
+            ("opponent", self._team_aliases)
+        )
+        # Exact matches of any kind before any fuzzy one, and words used by
+        # one entity are off limits for the others
+        for method in ("exact", "fuzzy"):
+            for kind, aliases in kinds:
+                if kind in found or (kind == "opponent" and "team" not in found):
+                    continue
+                exclude = found.get("team") if kind == "opponent" else None
+                entity_id, positions = self._match(words, getattr(aliases, method), taken, exclude)
+                if entity_id is not None:
+                    found[kind] = entity_id
+                    taken |= positions
+        player_id, team_id, opponent_id = found.get("player"), found.get("team"), found.get("opponent")
+        return {
+            "player_id": player_id,
+            "player_name": self.players.get(player_id, {}).get("name"),
+            "team_id": team_id,
+            "team_name": self.teams.get(team_id, {}).get("name"),
+            "opponent_id": opponent_id,
+            "opponent_name": self.teams.get(opponent_id, {}).get("name")
+        }
@@ -0,0 +1,67 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, List, Optional
+
+_CLOSED = object()
+
+class EventChannel:
+    """Push-based event stream for one request.
+
+    Producers (the workflow thread, or tasks on the loop) call put() and the
+    event is handed to the SSE generator as soon as the loop runs, with no
+    polling. Once the consumer closes the channel, e.g. because the client
+    disconnected, further puts are dropped and producers can check closed
+    to stop early.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._loop = loop or asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+        self._recording: Optional[List[Any]] = None
+
+    def start_recording(self):
+        """Keep a copy of every event from now on, e.g. to replay it later"""
+        self._recording = []
+
+    def stop_recording(self) -> Optional[List[Any]]:
+        recording, self._recording = self._recording, None
+        return recording
+
+    def put(self, event: Any):
+        if self._recording is not None:
+            self._recording.append(event)
+        if self.closed:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except RuntimeError:
+            # Loop already shut down; nobody is listening any more
+            self.closed = True
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, _CLOSED)
+            except RuntimeError:
+                pass
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        while True:
+            event = await self._queue.get()
+            if event is _CLOSED:
+                return
+            yield event
+
+# Channel of the request being processed; set by whoever runs the workflow
+# so nodes can emit events without threading the channel through the state
+current_channel: ContextVar[Optional[EventChannel]] = ContextVar("current_channel", default=None)
+
+def emit(event: Any) -> bool:
+    """Put event on the current request's channel; False if there is none."""
+    channel = current_channel.get()
+    if channel is None:
+        return False
+    channel.put(event)
+    return not channel.closed
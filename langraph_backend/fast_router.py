@@ -0,0 +1,231 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from answer_cache import QUESTION_STOPWORDS
+from entity_index import normalize
+
+# A query is routed without the LLM only if its best tool scores at least
+# this (cosine similarity) and beats the runner-up by the margin
+FAST_ROUTE_MIN_SCORE = float(os.getenv("FAST_ROUTE_MIN_SCORE", "0.35"))
+FAST_ROUTE_MIN_MARGIN = float(os.getenv("FAST_ROUTE_MIN_MARGIN", "0.15"))
+
+# Multi-word terms that name one thing
+PHRASES = {
+    "box score": "boxscore",
+    "line score": "linescore",
+    "play by play": "playbyplay",
+    "win probability": "winprobability",
+    "win probabilities": "winprobability",
+    "world series": "postseason",
+    "playoffs": "postseason",
+    "playoff": "postseason",
+}
+
+POSTSEASON = re.compile(r"\b(postseason|playoffs?|world series|wild card|alcs|nlcs|alds|nlds)\b")
+TODAY = re.compile(r"\b(today|tonight)\b")
+YEAR = re.compile(r"\b(19|20)\d\d\b")
+
+def _stem(word: str) -> str:
+    """Crude suffix folding: games/game, scheduled/schedule, playing/play"""
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+def route_terms(query: str, entity_names: Iterable[Optional[str]] = ()) -> List[str]:
+    """Routing features of a query; resolved entity names carry no intent"""
+    text = normalize(query)
+    for phrase, term in PHRASES.items():
+        text = re.sub(rf"\b{phrase}\b", term, text)
+    names = {word for name in entity_names if name for word in normalize(name).split()}
+    return [
+        "<year>" if YEAR.fullmatch(word) else _stem(word)
+        for word in text.split()
+        if word not in QUESTION_STOPWORDS and word not in names
+    ]
+
+def _unit(weights: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(value * value for value in weights.values()))
+    return {term: value / norm for term, value in weights.items()} if norm else {}
+
+class ToolClassifier:
+    """Nearest-centroid TF-IDF classifier over (text, tool) documents"""
+
+    def __init__(self, documents: List[Tuple[str, str]]):
+        bags = [(set(route_terms(text)), tool) for text, tool in documents]
+        document_frequency = Counter(term for bag, _ in bags for term in bag)
+        self.idf = {
+            term: math.log((1 + len(bags)) / (1 + count)) + 1
+            for term, count in document_frequency.items()
+        }
+        sums: Dict[str, Counter] = {}
+        for bag, tool in bags:
+            for term, weight in _unit({term: self.idf[term] for term in bag}).items():
+                sums.setdefault(tool, Counter())[term] += weight
+        self.centroids = {tool: _unit(dict(weights)) for tool, weights in sums.items()}
+
+    def scores(self, query: str, entity_names: Iterable[Optional[str]] = ()) -> List[Tuple[float, str]]:
+        """(cosine similarity, tool) for every tool, best first"""
+        vector = _unit({
+            term: self.idf[term]
+            for term in set(route_terms(query, entity_names)) if term in self.idf
+        })
+        return sorted(
+            ((sum(centroid.get(term, 0.0) * weight for term, weight in vector.items()), tool)
+             for tool, centroid in self.centroids.items()),
+            reverse=True
+        )
+
+# Builders for the input of a fast-routed call, from the query and the
+# entities resolved locally; None when something the tool needs is missing
+def _season(query: str, today: date) -> int:
+    match = YEAR.search(query)
+    return int(match.group(0)) if match else today.year
+
+def _live_game_input(query: str, entities: Dict[str, Any], today: date) -> Optional[Dict[str, Any]]:
+    if entities.get("game_pk") is None:
+        return None
+    return {"game_pk": entities["game_pk"]}
+
+def _schedule_input(query: str, entities: Dict[str, Any], today: date) -> Optional[Dict[str, Any]]:
+    text = query.lower()
+    tool_input = {"season": _season(text, today), "game_type": "P" if POSTSEASON.search(text) else "R"}
+    game = entities.get("game")
+    if game is not None:
+        # The schedule index already found the game ("next Dodgers home
+        # game"); the fast plan gets no second round, so ask for its day
+        game_day = date.fromisoformat(game["official_date"])
+        tool_input["season"] = game_day.year
+        tool_input["game_type"] = game.get("game_type") or tool_input["game_type"]
+        tool_input["date"] = game_day.strftime("%m/%d/%Y")
+    elif TODAY.search(text):
+        tool_input["date"] = today.strftime("%m/%d/%Y")
+    if entities.get("team_id") is not None:
+        tool_input["team_id"] = entities["team_id"]
+    return tool_input
+
+def _roster_input(query: str, entities: Dict[str, Any], today: date) -> Optional[Dict[str, Any]]:
+    if entities.get("team_id") is None:
+        return None
+    return {"team_id": entities["team_id"], "season": _season(query, today)}
+
+ROUTE_INPUTS: Dict[str, Callable[[str, Dict[str, Any], date], Optional[Dict[str, Any]]]] = {
+    "get_live_game_data": _live_game_input,
+    "get_season_schedule": _schedule_input,
+    "get_team_roster": _roster_input,
+}
+
+class FastRouter:
+    """Picks the tool for clear-cut queries without asking the LLM.
+
+    Trained from examples.json (query -> expected_tool), with each tool's
+    one-line description as a prior, so queries about tools that have no
+    examples score against those instead of being forced into a known
+    one. Only confident picks whose input can be built from the resolved
+    entities are routed; everything else goes to the LLM as before.
+    """
+
+    def __init__(self, examples: List[Dict[str, Any]], tool_summaries: Dict[str, str],
+                 min_score: float = FAST_ROUTE_MIN_SCORE, min_margin: float = FAST_ROUTE_MIN_MARGIN):
+        self.examples = examples
+        self.tool_summaries = tool_summaries
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.classifier = self._train(examples)
+        self.evaluation = self.evaluate()
+        self._stats = {"fast_routed": 0, "llm_routed": 0, "fast_seconds": 0.0, "llm_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, tool_summaries: Dict[str, str], **kwargs) -> "FastRouter":
+        with open(path) as f:
+            return cls(json.load(f).get("example_queries", []), tool_summaries, **kwargs)
+
+    def _train(self, examples: List[Dict[str, Any]]) -> ToolClassifier:
+        documents = [(summary, tool) for tool, summary in self.tool_summaries.items()]
+        documents += [(example["query"], example["expected_tool"]) for example in examples]
+        return ToolClassifier(documents)
+
+    def _confident(self, scores: List[Tuple[float, str]]) -> Optional[str]:
+        best, tool = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        if best >= self.min_score and best - runner_up >= self.min_margin:
+            return tool
+        return None
+
+    def classify(self, query: str, entity_names: Iterable[Optional[str]] = ()) -> Optional[str]:
+        """The tool for query, or None if the call is not clear-cut"""
+        return self._confident(self.classifier.scores(query, entity_names))
+
+    def route(self, query: str, entities: Dict[str, Any], today: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+        """A one-call plan in the routing LLM's format, or None to ask the LLM"""
+        names = [entities.get("player_name"), entities.get("team_name"), entities.get("opponent_name")]
+        tool = self.classify(query, names)
+        build_input = ROUTE_INPUTS.get(tool)
+        if build_input is None:
+            return None
+        tool_input = build_input(query, entities, today or date.today())
+        return [{"tool": tool, "input": tool_input}] if tool_input is not None else None
+
+    def evaluate(self) -> Dict[str, Any]:
+        """Accuracy against the examples, on the training set and leave-one-out.
+
+        Leave-one-out is the honest number: each example is classified by a
+        router trained on the others. routed_* only count the examples that
+        cleared the confidence bar, i.e. what the fast path would have done.
+        """
+        total = len(self.examples)
+        correct = sum(
+            self.classifier.scores(example["query"])[0][1] == example["expected_tool"]
+            for example in self.examples
+        )
+        held_out_correct = routed = routed_correct = 0
+        for index, example in enumerate(self.examples):
+            classifier = self._train(self.examples[:index] + self.examples[index + 1:])
+            scores = classifier.scores(example["query"])
+            held_out_correct += scores[0][1] == example["expected_tool"]
+            tool = self._confident(scores)
+            if tool is not None:
+                routed += 1
+                routed_correct += tool == example["expected_tool"]
+        return {
+            "examples": total,
+            "accuracy": round(correct / total, 3) if total else None,
+            "loo_accuracy": round(held_out_correct / total, 3) if total else None,
+            "loo_routed": routed,
+            "loo_routed_accuracy": round(routed_correct / routed, 3) if routed else None
+        }
+
+    def record(self, fast: bool, seconds: float):
+        """Count a routing decision and how long it took"""
+        with self._lock:
+            self._stats["fast_routed" if fast else "llm_routed"] += 1
+            self._stats["fast_seconds" if fast else "llm_seconds"] += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        llm_average = stats["llm_seconds"] / stats["llm_routed"] if stats["llm_routed"] else None
+        fast_average = stats["fast_seconds"] / stats["fast_routed"] if stats["fast_routed"] else None
+        return {
+            "fast_routed": stats["fast_routed"],
+            "llm_routing_calls": stats["llm_routed"],
+            "avg_llm_routing_ms": round(llm_average * 1000, 1) if llm_average is not None else None,
+            "avg_fast_routing_ms": round(fast_average * 1000, 3) if fast_average is not None else None,
+            # Each fast route skipped one LLM routing call of average length
+            "estimated_seconds_saved": round(
+                stats["fast_routed"] * llm_average - stats["fast_seconds"], 2
+            ) if llm_average is not None else None,
+            "evaluation": self.evaluation
+        }
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+DEFAULT_ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "game_archive.sqlite3")
+
+# A game found still in progress is not asked about again for this long
+STATUS_RECHECK_SECONDS = float(os.getenv("MLB_STATUS_RECHECK", "15"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    endpoint TEXT NOT NULL,
+    game_pk INTEGER NOT NULL,
+    timecode TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (endpoint, game_pk, timecode, variant)
+);
+CREATE TABLE IF NOT EXISTS final_games (
+    game_pk INTEGER PRIMARY KEY
+);
+"""
+
+def variant_key(params: Optional[Dict[str, Any]]) -> str:
+    """Query params other than timecode (e.g. inning filters), normalized"""
+    extra = sorted((str(k), str(v)) for k, v in (params or {}).items() if k != "timecode" and v is not None)
+    return "&".join(f"{k}={v}" for k, v in extra)
+
+class GameArchive:
+    """Write-once store for game documents that can never change again.
+
+    Documents for a final game, or any request pinned to a timecode, are
+    immutable, so the first fetch is compressed into SQLite and every later
+    call is served locally with no network round-trip.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("MLB_ARCHIVE_PATH", DEFAULT_ARCHIVE_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._final_games = {row[0] for row in self._conn.execute("SELECT game_pk FROM final_games")}
+        # In-flight status checks, so concurrent callers share one fetch
+        self._status_checks: Dict[int, "asyncio.Future[bool]"] = {}
+        self._live_checked_at: Dict[int, float] = {}
+
+    def get(self, endpoint: str, game_pk, timecode: Optional[str], params: Optional[Dict[str, Any]] = None) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM documents WHERE endpoint = ? AND game_pk = ? AND timecode = ? AND variant = ?",
+                (endpoint, int(game_pk), timecode or "", variant_key(params))
+            ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def put(self, endpoint: str, game_pk, timecode: Optional[str], params: Optional[Dict[str, Any]], data: dict):
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode(), 6)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+                (endpoint, int(game_pk), timecode or "", variant_key(params), body)
+            )
+
+    def is_final(self, game_pk) -> bool:
+        return int(game_pk) in self._final_games
+
+    def mark_final(self, game_pk):
+        if self.is_final(game_pk):
+            return
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO final_games VALUES (?)", (int(game_pk),))
+        self._final_games.add(int(game_pk))
+
+    async def check_final(self, game_pk, fetch_is_final: Callable[[], Awaitable[bool]]) -> bool:
+        """is_final, awaiting fetch_is_final() when the archive does not know yet.
+
+        Concurrent checks of one game await a single fetch, and a game found
+        in progress is reported as such for STATUS_RECHECK_SECONDS without
+        asking again, so all the tools of a round cost one status call.
+        Callers share one event loop (the tool loop).
+        """
+        game_pk = int(game_pk)
+        if game_pk in self._final_games:
+            return True
+        checked_at = self._live_checked_at.get(game_pk)
+        if checked_at is not None and time.monotonic() - checked_at < STATUS_RECHECK_SECONDS:
+            return False
+        pending = self._status_checks.get(game_pk)
+        if pending is None:
+            pending = asyncio.ensure_future(self._resolve_final(game_pk, fetch_is_final))
+            self._status_checks[game_pk] = pending
+            pending.add_done_callback(lambda _: self._status_checks.pop(game_pk, None))
+        # One caller going away must not cancel the check for the others
+        return await asyncio.shield(pending)
+
+    async def _resolve_final(self, game_pk: int, fetch_is_final: Callable[[], Awaitable[bool]]) -> bool:
+        if await fetch_is_final():
+            self.mark_final(game_pk)
+            self._live_checked_at.pop(game_pk, None)
+            return True
+        self._live_checked_at[game_pk] = time.monotonic()
+        return False
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import Request
+
+from live_game import feed_is_final, feed_timecode
+
+logger = logging.getLogger("MLB_Agent")
+
+# Seconds between upstream polls of one game; the feed's own metaData.wait
+# hint is honoured when it asks for longer
+GAME_POLL_INTERVAL = float(os.getenv("GAME_POLL_INTERVAL", "5"))
+
+# A poller with no subscribers for this long stops
+GAME_POLL_IDLE_TIMEOUT = float(os.getenv("GAME_POLL_IDLE_TIMEOUT", "30"))
+
+# Updates buffered per subscriber; a slow client skips to the newest state
+SUBSCRIBER_BUFFER = 8
+
+# How often a waiting stream checks whether its client went away
+DISCONNECT_CHECK_INTERVAL = 15.0
+
+def game_summary(doc: dict) -> Dict[str, Any]:
+    """The part of a feed/live document a scoreboard needs."""
+    game_data = doc.get("gameData", {})
+    linescore = doc.get("liveData", {}).get("linescore", {})
+    current_play = doc.get("liveData", {}).get("plays", {}).get("currentPlay", {})
+    teams = game_data.get("teams", {})
+    return {
+        "game_pk": doc.get("gamePk"),
+        "timecode": feed_timecode(doc),
+        "status": game_data.get("status", {}).get("detailedState"),
+        "home_team": teams.get("home", {}).get("name"),
+        "away_team": teams.get("away", {}).get("name"),
+        "home_score": linescore.get("teams", {}).get("home", {}).get("runs"),
+        "away_score": linescore.get("teams", {}).get("away", {}).get("runs"),
+        "inning": linescore.get("currentInning"),
+        "inning_half": linescore.get("inningHalf"),
+        "outs": linescore.get("outs"),
+        "count": current_play.get("count"),
+        "last_play": current_play.get("result", {}).get("description")
+    }
+
+def sse_message(event_type: str, data: Dict[str, Any]) -> str:
+    return json.dumps({
+        "event": event_type,
+        "data": {
+            "timestamp": datetime.now().isoformat(),
+            **data
+        }
+    })
+
+class GamePoller:
+    """One upstream polling loop for a game, fanned out to every subscriber."""
+
+    def __init__(self, game_pk: int, fetch_state: Callable[[int], Awaitable[dict]],
+                 interval: float, idle_timeout: float):
+        self.game_pk = game_pk
+        self.fetch_state = fetch_state
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[str] = None
+        self.polls = 0
+        self.task: Optional[asyncio.Task] = None
+        self._idle_since = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            self._idle_since = time.monotonic()
+
+    def _publish(self, message: Optional[str]):
+        # None tells subscribers the stream is over
+        if message is not None:
+            self.latest = message
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def run(self):
+        last_timecode = None
+        try:
+            while self.subscribers or time.monotonic() - self._idle_since < self.idle_timeout:
+                wait = self.interval
+                try:
+                    doc = await self.fetch_state(self.game_pk)
+                    self.polls += 1
+                    wait = max(self.interval, float(doc.get("metaData", {}).get("wait") or 0))
+                    if feed_timecode(doc) != last_timecode:
+                        last_timecode = feed_timecode(doc)
+                        final = feed_is_final(doc)
+                        self._publish(sse_message("game_final" if final else "game_update", game_summary(doc)))
+                        if final:
+                            break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Polling game_pk {self.game_pk} failed: {str(e)}")
+                    self._publish(sse_message("game_error", {"game_pk": self.game_pk, "error": str(e)}))
+                await asyncio.sleep(wait)
+        finally:
+            self._publish(None)
+            logger.info(f"Poller for game_pk {self.game_pk} stopped after {self.polls} polls")
+
+class GameStreamHub:
+    """Shares one GamePoller per game between all SSE clients watching it.
+
+    Upstream traffic scales with the number of games being watched, not the
+    number of viewers. Pollers start on the first subscriber and stop on
+    their own once nobody has been subscribed for idle_timeout seconds, or
+    when the game goes final.
+    """
+
+    def __init__(self, fetch_state: Callable[[int], Awaitable[dict]],
+                 interval: float = GAME_POLL_INTERVAL, idle_timeout: float = GAME_POLL_IDLE_TIMEOUT):
+        self.fetch_state = fetch_state
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._pollers: Dict[int, GamePoller] = {}
+
+    def _poller(self, game_pk: int) -> GamePoller:
+        poller = self._pollers.get(game_pk)
+        if poller is None or not poller.running:
+            poller = GamePoller(game_pk, self.fetch_state, self.interval, self.idle_timeout)
+            poller.task = asyncio.create_task(poller.run())
+            poller.task.add_done_callback(lambda _, poller=poller: self._forget(poller))
+            self._pollers[game_pk] = poller
+        return poller
+
+    def _forget(self, poller: GamePoller):
+        if self._pollers.get(poller.game_pk) is poller:
+            del self._pollers[poller.game_pk]
+
+    async def stream(self, game_pk: int, request: Request) -> AsyncGenerator[str, None]:
+        """SSE messages for one client until the game ends or it disconnects."""
+        poller = self._poller(game_pk)
+        queue = poller.subscribe()
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=DISCONNECT_CHECK_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            poller.unsubscribe(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "games": {
+                str(game_pk): {"subscribers": len(poller.subscribers), "polls": poller.polls}
+                for game_pk, poller in self._pollers.items()
+            }
+        }
+
+    async def aclose(self):
+        for poller in list(self._pollers.values()):
+            poller.task.cancel()
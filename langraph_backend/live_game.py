@@ -0,0 +1,256 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("MLB_Agent")
+
+# Games whose latest document is kept in memory, least recently used dropped
+MAX_LIVE_GAMES = 64
+
+# A document younger than this is served as-is; older ones are brought
+# forward with a diffPatch call
+LIVE_MIN_INTERVAL = 2.0
+
+class PatchConflict(Exception):
+    """A JSON Patch operation does not apply to the current document."""
+
+# JSON Patch (RFC 6902) applied with path copying: only the containers on the
+# path of each operation are copied, so the previous document is never
+# mutated and can be handed out to readers while the next one is built.
+
+def _pointer(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise PatchConflict(f"invalid pointer {path!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in path[1:].split("/")]
+
+def _index(container, token: str, allow_end: bool = False):
+    if isinstance(container, list):
+        if token == "-" and allow_end:
+            return len(container)
+        if not token.isdigit():
+            raise PatchConflict(f"invalid array index {token!r}")
+        index = int(token)
+        if index > len(container) or (index == len(container) and not allow_end):
+            raise PatchConflict(f"array index {index} out of range")
+        return index
+    if isinstance(container, dict):
+        return token
+    raise PatchConflict(f"cannot index into {type(container).__name__}")
+
+def _resolve(doc, tokens: List[str]):
+    for token in tokens:
+        key = _index(doc, token)
+        if isinstance(doc, dict) and key not in doc:
+            raise PatchConflict(f"missing member {key!r}")
+        doc = doc[key]
+    return doc
+
+def _update(node, tokens: List[str], leaf: Callable[[Any, Any], None]):
+    """Copy node, recurse into tokens[0], and let leaf edit the last parent."""
+    if len(tokens) == 1:
+        copy = list(node) if isinstance(node, list) else dict(node) if isinstance(node, dict) else None
+        if copy is None:
+            raise PatchConflict(f"cannot index into {type(node).__name__}")
+        leaf(copy, tokens[0])
+        return copy
+    key = _index(node, tokens[0])
+    if isinstance(node, dict) and key not in node:
+        raise PatchConflict(f"missing member {key!r}")
+    copy = list(node) if isinstance(node, list) else dict(node)
+    copy[key] = _update(node[key], tokens[1:], leaf)
+    return copy
+
+def _add(doc, tokens, value):
+    if not tokens:
+        return value
+
+    def leaf(parent, token):
+        key = _index(parent, token, allow_end=True)
+        if isinstance(parent, list):
+            parent.insert(key, value)
+        else:
+            parent[key] = value
+    return _update(doc, tokens, leaf)
+
+def _remove(doc, tokens):
+    if not tokens:
+        raise PatchConflict("cannot remove the whole document")
+
+    def leaf(parent, token):
+        key = _index(parent, token)
+        if isinstance(parent, dict) and key not in parent:
+            raise PatchConflict(f"missing member {key!r}")
+        del parent[key]
+    return _update(doc, tokens, leaf)
+
+def _replace(doc, tokens, value):
+    if not tokens:
+        return value
+
+    def leaf(parent, token):
+        key = _index(parent, token)
+        if isinstance(parent, dict) and key not in parent:
+            raise PatchConflict(f"missing member {key!r}")
+        parent[key] = value
+    return _update(doc, tokens, leaf)
+
+def apply_patch(doc, operations: List[Dict[str, Any]]):
+    """Return doc with the operations applied; doc itself is left untouched."""
+    try:
+        for op in operations:
+            tokens = _pointer(op["path"])
+            kind = op["op"]
+            if kind == "add":
+                doc = _add(doc, tokens, op["value"])
+            elif kind == "remove":
+                doc = _remove(doc, tokens)
+            elif kind == "replace":
+                doc = _replace(doc, tokens, op["value"])
+            elif kind == "move":
+                source = _pointer(op["from"])
+                value = _resolve(doc, source)
+                doc = _add(_remove(doc, source), tokens, value)
+            elif kind == "copy":
+                doc = _add(doc, tokens, _resolve(doc, _pointer(op["from"])))
+            elif kind == "test":
+                if _resolve(doc, tokens) != op["value"]:
+                    raise PatchConflict(f"test failed at {op['path']!r}")
+            else:
+                raise PatchConflict(f"unknown op {kind!r}")
+    except (KeyError, IndexError, TypeError) as e:
+        raise PatchConflict(f"malformed operation: {e}") from e
+    return doc
+
+def feed_timecode(doc: dict) -> Optional[str]:
+    return doc.get("metaData", {}).get("timeStamp")
+
+def feed_is_final(doc: dict) -> bool:
+    return doc.get("gameData", {}).get("status", {}).get("abstractGameState") == "Final"
+
+@dataclass
+class LiveGame:
+    doc: dict
+    timecode: Optional[str]
+    refreshed_at: float
+    final: bool
+
+class LiveGameState:
+    """Latest feed/live document per game, moved forward with diffPatch.
+
+    The first request for a game downloads the full feed. Later requests ask
+    feed/live/diffPatch for the changes since the held timecode and apply
+    them locally, so a poll costs a few KB instead of several MB. The full
+    feed is fetched again only when there is no usable state: the API
+    answered with a full document (the timecode was too old), a patch did
+    not apply, or the document has no timecode. Final games are served from
+    memory without asking upstream at all.
+
+    Documents are shared between callers and must be treated as read-only.
+    The HTTP call is injected, so the same state serves the sync and async
+    tools and can be pointed at a local replay server (live_replay_server.py).
+    """
+
+    def __init__(self, base_url: str, max_games: int = MAX_LIVE_GAMES,
+                 min_interval: float = LIVE_MIN_INTERVAL):
+        self.base_url = base_url.rstrip("/")
+        self.max_games = max_games
+        self.min_interval = min_interval
+        self._games: "OrderedDict[int, LiveGame]" = OrderedDict()
+        self._stats = {"full_fetches": 0, "patch_fetches": 0, "patches_applied": 0,
+                       "conflicts": 0, "served_from_memory": 0}
+        self._lock = threading.Lock()
+
+    def feed_request(self, game_pk) -> Tuple[str, Dict[str, Any]]:
+        return f"{self.base_url}/game/{game_pk}/feed/live", {}
+
+    def diff_request(self, game_pk, timecode: str) -> Tuple[str, Dict[str, Any]]:
+        return f"{self.base_url}/game/{game_pk}/feed/live/diffPatch", {"startTimecode": timecode}
+
+    def _plan(self, game_pk: int) -> Tuple[Optional[LiveGame], Optional[Tuple[str, Dict[str, Any]]]]:
+        """Return (held state, request to make), request None if state is fresh."""
+        with self._lock:
+            game = self._games.get(game_pk)
+            if game is None or game.timecode is None:
+                return game, self.feed_request(game_pk)
+            self._games.move_to_end(game_pk)
+            if game.final or time.time() - game.refreshed_at < self.min_interval:
+                self._stats["served_from_memory"] += 1
+                return game, None
+            return game, self.diff_request(game_pk, game.timecode)
+
+    def _store(self, game_pk: int, doc: dict, base: Optional[LiveGame]) -> dict:
+        with self._lock:
+            current = self._games.get(game_pk)
+            if current is not base and current is not None:
+                # Someone else moved this game forward while we were fetching
+                # from an older timecode; theirs is at least as new
+                return current.doc
+            self._games[game_pk] = LiveGame(
+                doc=doc,
+                timecode=feed_timecode(doc),
+                refreshed_at=time.time(),
+                final=feed_is_final(doc)
+            )
+            self._games.move_to_end(game_pk)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+            return doc
+
+    def _advance(self, game_pk: int, game: Optional[LiveGame], response) -> Optional[dict]:
+        """Fold a feed or diffPatch response into the state; None means refetch."""
+        if isinstance(response, dict):
+            with self._lock:
+                self._stats["full_fetches"] += 1
+            return self._store(game_pk, response, game)
+        with self._lock:
+            self._stats["patch_fetches"] += 1
+        doc = game.doc
+        try:
+            for patch in response:
+                doc = apply_patch(doc, patch.get("diff", []))
+        except PatchConflict as e:
+            logger.warning(f"diffPatch for game_pk {game_pk} did not apply ({e}), refetching full feed")
+            with self._lock:
+                self._stats["conflicts"] += 1
+            return None
+        with self._lock:
+            self._stats["patches_applied"] += len(response)
+        return self._store(game_pk, doc, game)
+
+    def _discard(self, game_pk: int, game: Optional[LiveGame]):
+        with self._lock:
+            if self._games.get(game_pk) is game:
+                self._games.pop(game_pk, None)
+
+    def get(self, game_pk, fetch: Callable[[str, Dict[str, Any]], Any]) -> dict:
+        """Current document for game_pk; fetch(url, params) returns parsed JSON."""
+        game_pk = int(game_pk)
+        game, request = self._plan(game_pk)
+        if request is None:
+            return game.doc
+        doc = self._advance(game_pk, game, fetch(*request))
+        if doc is None:
+            self._discard(game_pk, game)
+            doc = self._advance(game_pk, None, fetch(*self.feed_request(game_pk)))
+        return doc
+
+    async def aget(self, game_pk, fetch) -> dict:
+        """Async variant of get; fetch(url, params) is awaited."""
+        game_pk = int(game_pk)
+        game, request = self._plan(game_pk)
+        if request is None:
+            return game.doc
+        doc = self._advance(game_pk, game, await fetch(*request))
+        if doc is None:
+            self._discard(game_pk, game)
+            doc = self._advance(game_pk, None, await fetch(*self.feed_request(game_pk)))
+        return doc
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"games": len(self._games), **self._stats}
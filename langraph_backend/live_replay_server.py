@@ -0,0 +1,140 @@
+"""Local stand-in for the Stats API live feed, replaying a recorded game.
+
+Serves /api/v1.1/game/{game_pk}/feed/live and .../feed/live/diffPatch from a
+recording, advancing one patch per --step seconds (or per diffPatch request
+with --step 0), so LiveGameState can be exercised without a game in progress:
+
+    python live_replay_server.py record 746577 game.json --duration 600
+    python live_replay_server.py serve game.json --port 8765
+    MLB_LIVE_API_BASE=http://localhost:8765/api/v1.1 python main.py
+
+A recording is {"game_pk", "initial": <feed/live document>, "patches":
+[{"timecode", "diff": [JSON Patch ops]}, ...]}, each timecode being the
+metaData.timeStamp of the document once that patch is applied.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from live_game import apply_patch, feed_is_final, feed_timecode
+
+MLB_API_BASE_V1_1 = "https://statsapi.mlb.com/api/v1.1"
+
+FEED_PATH = re.compile(r"^/api/v1\.1/game/(\d+)/feed/live(/diffPatch)?/?$")
+
+class Replay:
+    def __init__(self, recording: dict, step: float):
+        self.game_pk = int(recording["game_pk"])
+        self.patches = recording["patches"]
+        self.step = step
+        self.started = time.time()
+        self.served = 0
+        # Document after each patch, so any timecode can be answered
+        self.docs = [recording["initial"]]
+        for patch in self.patches:
+            self.docs.append(apply_patch(self.docs[-1], patch["diff"]))
+        self.timecodes = [feed_timecode(doc) for doc in self.docs]
+        self._lock = threading.Lock()
+
+    def cursor(self, advance: bool) -> int:
+        """Number of patches released so far."""
+        with self._lock:
+            if self.step > 0:
+                released = int((time.time() - self.started) / self.step)
+            else:
+                if advance:
+                    self.served += 1
+                released = self.served
+            return min(released, len(self.patches))
+
+    def feed(self) -> dict:
+        return self.docs[self.cursor(advance=False)]
+
+    def diff(self, start_timecode: str):
+        cursor = self.cursor(advance=True)
+        if start_timecode not in self.timecodes[:cursor + 1]:
+            # Unknown or too old: the real API answers with the full document
+            return self.docs[cursor]
+        position = self.timecodes.index(start_timecode)
+        return [{"diff": patch["diff"]} for patch in self.patches[position:cursor]]
+
+def make_handler(replay: Replay):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            match = FEED_PATH.match(parts.path)
+            if not match or int(match.group(1)) != replay.game_pk:
+                self.send_error(404)
+                return
+            if match.group(2):
+                start = parse_qs(parts.query).get("startTimecode", [""])[0]
+                body = replay.diff(start)
+            else:
+                body = replay.feed()
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            print(f"{self.address_string()} {format % args}")
+
+    return Handler
+
+def record(game_pk: int, output: str, duration: float, interval: float):
+    """Poll the real API and save the initial feed plus every diffPatch."""
+    session = requests.Session()
+    base = f"{MLB_API_BASE_V1_1}/game/{game_pk}/feed/live"
+    initial = session.get(base).json()
+    doc, patches = initial, []
+    deadline = time.time() + duration
+    while time.time() < deadline and not feed_is_final(doc):
+        time.sleep(interval)
+        response = session.get(f"{base}/diffPatch", params={"startTimecode": feed_timecode(doc)}).json()
+        if isinstance(response, dict):
+            print("Fell too far behind, recording stops here")
+            break
+        for patch in response:
+            doc = apply_patch(doc, patch.get("diff", []))
+            patches.append({"timecode": feed_timecode(doc), "diff": patch.get("diff", [])})
+        print(f"{len(patches)} patches, at {feed_timecode(doc)}")
+    with open(output, "w") as f:
+        json.dump({"game_pk": game_pk, "initial": initial, "patches": patches}, f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="replay a recording over HTTP")
+    serve_parser.add_argument("recording")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--step", type=float, default=5.0,
+                              help="seconds per released patch, 0 = one per diffPatch request")
+
+    record_parser = commands.add_parser("record", help="record a game in progress")
+    record_parser.add_argument("game_pk", type=int)
+    record_parser.add_argument("output")
+    record_parser.add_argument("--duration", type=float, default=600)
+    record_parser.add_argument("--interval", type=float, default=10)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.game_pk, args.output, args.duration, args.interval)
+        return
+
+    with open(args.recording) as f:
+        replay = Replay(json.load(f), args.step)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(replay))
+    print(f"Replaying game {replay.game_pk} ({len(replay.patches)} patches) on port {args.port}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
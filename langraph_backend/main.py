@@ -17,10 +17,24 @@ from langchain_openai import ChatOpenAI
 import json
 from datetime import datetime
 import asyncio
-from queue import Queue
-from threading import Thread
+import threading
+import time
+import httpx
 from langgraph.graph import Graph
-from langgraph.agent import Agent
+
+from mlb_http import AsyncMLBClient
+from agent_pool import AgentPool, PoolFull
+from answer_cache import AnswerCache, intent_key
+from entity_index import EntityIndex
+from fast_router import FastRouter
+from event_channel import EventChannel, current_channel, emit
+from game_archive import GameArchive
+from game_stream import GameStreamHub
+from live_game import LiveGameState, feed_is_final
+from play_store import PlayStore
+from schedule_index import ScheduleIndex
+from tool_projection import estimate_tokens, project_tool_output
+from response_cache import DEFAULT_TTL, ResponseCache, ttl_for
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +49,57 @@ load_dotenv()
 # Initialize FastAPI
 app = FastAPI(title="MLB Data Agent API", version="1.0.0")
 
+@app.on_event("startup")
+async def start_background_indexes():
+    global tool_loop
+    # Agent tool calls share the server's loop and its pooled client
+    tool_loop = asyncio.get_running_loop()
+    entity_index.start()
+    schedule_index.start()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await game_streams.aclose()
+    await async_client.aclose()
+    agent_pool.shutdown()
+    entity_index.stop()
+    schedule_index.stop()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Per-tool hit/miss/revalidation counts of the MLB response cache"""
+    return response_cache.stats()
+
+@app.get("/live/stats")
+async def live_stats():
+    """Full fetches vs diffPatch polls of the in-memory live game state"""
+    return live_games.stats()
+
+@app.get("/games/{game_pk}/stream")
+async def stream_game(request: Request, game_pk: int):
+    """Stream score/state changes of a game; one upstream poller per game"""
+    return EventSourceResponse(game_streams.stream(game_pk, request))
+
+@app.get("/query/stats")
+async def query_stats():
+    """Agent pool load: running workflows, queue depth and queue wait times"""
+    return agent_pool.stats()
+
+@app.get("/routing/stats")
+async def routing_stats():
+    """Fast-path vs LLM routing counts, latency saved and example accuracy"""
+    return fast_router.stats()
+
+@app.get("/answers/stats")
+async def answer_stats():
+    """Hit/miss counts of the intent-keyed answer cache"""
+    return answer_cache.stats()
+
+@app.get("/games/stream/stats")
+async def game_stream_stats():
+    """Active game pollers and their subscriber counts"""
+    return game_streams.stats()
+
 # Initialize Gemini with retry logic
 def create_llm():
     return ChatGoogleGenerativeAI(
@@ -46,7 +111,8 @@ def create_llm():
 
 llm = create_llm()
 
-# Configure requests session with retry logic
+# Requests session with retry logic, for the entity and schedule indexes
+# that refresh on their own threads
 session = requests.Session()
 retries = Retry(
     total=3,
@@ -56,10 +122,36 @@ retries = Retry(
 session.mount('http://', HTTPAdapter(max_retries=retries))
 session.mount('https://', HTTPAdapter(max_retries=retries))
 
+# Pooled async client for the tools, live state and game pollers
+# (keep-alive, per-host limits, non-blocking retries)
+async_client = AsyncMLBClient()
+
+# TTL + ETag/Last-Modified cache shared by the tools and the local indexes
+response_cache = ResponseCache()
+
+# Write-once local store for final games and timecoded snapshots
+game_archive = GameArchive()
+
 # MLB API Base URLs
 MLB_API_BASE_V1 = "https://statsapi.mlb.com/api/v1"
 MLB_API_BASE_V1_1 = "https://statsapi.mlb.com/api/v1.1"
 
+# Latest feed/live per game, kept current with diffPatch. The base URL can
+# point at live_replay_server.py for local testing.
+live_games = LiveGameState(os.getenv("MLB_LIVE_API_BASE", MLB_API_BASE_V1_1))
+
+async def fetch_live_state(game_pk: int) -> dict:
+    """One GamePoller poll; a final feed also settles the game in the archive"""
+    doc = await live_games.aget(
+        game_pk, lambda url, query: afetch_json("get_live_game_data", url, query, cached=False)
+    )
+    if feed_is_final(doc):
+        game_archive.mark_final(game_pk)
+    return doc
+
+# Shared pollers behind /games/{game_pk}/stream
+game_streams = GameStreamHub(fetch_live_state)
+
 # Define the state
 class AgentState(TypedDict):
     query: str
@@ -161,15 +253,203 @@ class DetailedAgentState(TypedDict):
     final_answer: Optional[str]
     player_id: Optional[str]
     team_id: Optional[str]
+    player_name: Optional[str]
+    team_name: Optional[str]
+    opponent_id: Optional[str]
+    opponent_name: Optional[str]
     game_pk: Optional[str]
+    game: Optional[Dict[str, Any]]
+    # Answer cache key of this query, and the hit being replayed if any
+    answer_key: Optional[str]
+    cached_answer: Optional[Any]
     execution_steps: List[Dict[str, Any]]
     start_time: datetime
+    # Independent tool calls chosen by should_use_tool, run together
+    pending_tool_calls: List[Dict[str, Any]]
+    tool_rounds: int
+    # Set when the first round was planned by fast_router, not the LLM
+    fast_routed: bool
+
+# Request builders shared by the tools and the caches in front of them.
+# Each takes the parsed tool_input and returns (url, query params).
+def _query(**params) -> Dict[str, Any]:
+    """Drop unset query parameters"""
+    return {key: value for key, value in params.items() if value is not None and value != ""}
+
+def live_game_data_request(params: dict):
+    url = f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/feed/live"
+    return url, _query(timecode=params.get("timecode"))
+
+# What project_schedule reads; a full season is several MB without fields=
+SCHEDULE_FIELDS = (
+    "dates,date,games,gamePk,gameDate,officialDate,status,abstractGameState,detailedState,"
+    "teams,away,home,team,id,name,score,leagueRecord,wins,losses"
+)
+
+def season_schedule_request(params: dict):
+    url = f"{MLB_API_BASE_V1}/schedule"
+    return url, _query(
+        sportId=params.get("sportId", "1"),
+        season=params.get("season"),
+        gameType=params.get("game_type", "R"),
+        teamId=params.get("team_id"),
+        date=params.get("date"),
+        startDate=params.get("start_date"),
+        endDate=params.get("end_date"),
+        hydrate=params.get("hydrate"),
+        # Hydrations add fields the projection doesn't know, keep them whole
+        fields=None if params.get("hydrate") else SCHEDULE_FIELDS
+    )
+
+def team_roster_request(params: dict):
+    url = f"{MLB_API_BASE_V1}/teams/{params.get('team_id')}/roster"
+    return url, _query(season=params.get("season"), hydrate=params.get("hydrate"))
+
+def team_info_request(params: dict):
+    url = f"{MLB_API_BASE_V1}/teams/{params.get('team_id')}"
+    return url, _query(season=params.get("season"))
+
+def player_info_request(params: dict):
+    url = f"{MLB_API_BASE_V1}/people/{params.get('player_id')}"
+    return url, _query(season=params.get("season"))
+
+def game_boxscore_request(params: dict):
+    url = f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/boxscore"
+    return url, _query(timecode=params.get("timecode"))
+
+def game_linescore_request(params: dict):
+    url = f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/linescore"
+    return url, _query(timecode=params.get("timecode"))
+
+def game_plays_request(params: dict):
+    url = f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/plays"
+    return url, _query(
+        timecode=params.get("timecode"),
+        inning=params.get("inning"),
+        topBottom=params.get("top_bottom")
+    )
+
+def player_stats_request(params: dict):
+    url = f"{MLB_API_BASE_V1}/people/{params.get('player_id')}/stats"
+    return url, _query(
+        season=params.get("season"),
+        group=params.get("group"),
+        gameType=params.get("game_type", "R")
+    )
+
+def game_timestamps_request(params: dict):
+    return f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/feed/live/timestamps", {}
+
+def game_decisions_request(params: dict):
+    return f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/decisions", {}
+
+def game_context_metrics_request(params: dict):
+    url = f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/contextMetrics"
+    return url, _query(timecode=params.get("timecode"))
+
+def game_win_probability_request(params: dict):
+    url = f"{MLB_API_BASE_V1_1}/game/{params.get('game_pk')}/winProbability"
+    return url, _query(timecode=params.get("timecode"))
+
+def search_player_request(params: dict):
+    return f"{MLB_API_BASE_V1}/people/search", _query(names=params.get("name"))
+
+def search_teams_request(params: dict):
+    active_status = params.get("activeStatus")
+    return f"{MLB_API_BASE_V1}/teams", _query(
+        season=params.get("season"),
+        sportId=params.get("sportId", "1"),
+        activeStatus=str(active_status).lower() if active_status is not None else None
+    )
+
+TOOL_REQUESTS = {
+    "get_live_game_data": live_game_data_request,
+    "get_season_schedule": season_schedule_request,
+    "get_team_roster": team_roster_request,
+    "get_team_info": team_info_request,
+    "get_player_info": player_info_request,
+    "get_game_boxscore": game_boxscore_request,
+    "get_game_linescore": game_linescore_request,
+    "get_game_plays": game_plays_request,
+    "get_player_stats": player_stats_request,
+    "get_game_timestamps": game_timestamps_request,
+    "get_game_decisions": game_decisions_request,
+    "get_game_contextMetrics": game_context_metrics_request,
+    "get_game_winProbability": game_win_probability_request,
+    "search_player": search_player_request,
+    "search_teams": search_teams_request,
+}
+
+def fetch_json(tool_name: str, url: str, params: Optional[Dict[str, Any]] = None, cached: bool = True) -> dict:
+    """Blocking GET through the response cache and the shared requests Session"""
+    if not cached:
+        response = session.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+    return response_cache.get_json(
+        tool_name, url, params,
+        lambda headers: session.get(url, params=params, headers=headers)
+    )
+
+async def afetch_json(tool_name: str, url: str, params: Optional[Dict[str, Any]] = None, cached: bool = True) -> dict:
+    """Non-blocking GET through the response cache and the pooled async client"""
+    if not cached:
+        return await async_client.get_json(url, params)
+    return await response_cache.aget_json(
+        tool_name, url, params,
+        lambda headers: async_client.get(url, params=params, headers=headers)
+    )
+
+def game_status_request(game_pk):
+    # fields= trims the live feed down to a few bytes
+    url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/feed/live"
+    return url, {"fields": "gameData,status,abstractGameState"}
+
+async def ais_game_final(game_pk) -> bool:
+    async def fetch_is_final() -> bool:
+        return feed_is_final(await afetch_json("game_status", *game_status_request(game_pk), cached=False))
+    # One status call per game however many tools ask at once; none once
+    # the archive has seen the game final. The archive's recheck window
+    # replaces the response cache TTL for these.
+    return await game_archive.check_final(game_pk, fetch_is_final)
+
+async def afetch_game_json(tool_name: str, game_pk, url: str, params: Dict[str, Any]) -> dict:
+    """afetch_json for per-game tools, served from the archive once immutable"""
+    if game_pk is None:
+        return await afetch_json(tool_name, url, params)
+    timecode = params.get("timecode")
+    archived = game_archive.get(tool_name, game_pk, timecode, params)
+    if archived is not None:
+        logger.info(f"{tool_name} for game_pk {game_pk} served from archive")
+        return archived
+    # Decide before fetching, and skip the TTL cache when archiving, so a
+    # snapshot taken just before the final out is never stored forever
+    immutable = bool(timecode) or await ais_game_final(game_pk)
+    data = await afetch_json(tool_name, url, params, cached=not immutable)
+    if immutable:
+        game_archive.put(tool_name, game_pk, timecode, params, data)
+    return data
+
+async def aload_game_plays(game_pk):
+    """Plays plus per-at-bat win probability (if available) for the play store"""
+    plays = await afetch_game_json("get_game_plays", game_pk, *game_plays_request({"game_pk": game_pk}))
+    try:
+        win_probability = await afetch_game_json(
+            "get_game_winProbability", game_pk, *game_win_probability_request({"game_pk": game_pk})
+        )
+    except httpx.HTTPError as e:
+        logger.warning(f"No win probability for game_pk {game_pk}: {str(e)}")
+        win_probability = None
+    return plays, win_probability
+
+# Parsed, indexed play-by-play per game, for query_game_plays
+play_store = PlayStore(aload_game_plays, ais_game_final)
 
 # Tool definitions with proper node structure
 class MLBTools:
     @staticmethod
     @tool("get_live_game_data", return_direct=True)
-    def get_live_game_data(tool_input: str) -> dict:
+    async def get_live_game_data(tool_input: str) -> dict:
         """Get live game data from MLB API
         Args:
             tool_input: JSON string containing:
@@ -178,49 +458,47 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         game_pk = params.get("game_pk")
-        timecode = params.get("timecode")
         
         logger.info(f"Fetching live game data for game_pk: {game_pk}")
-        base_url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/feed/live"
-        url = f"{base_url}?timecode={timecode}" if timecode else base_url
-        response = session.get(url)
-        response.raise_for_status()
+        if game_pk is not None and not params.get("timecode"):
+            data = await live_games.aget(
+                game_pk, lambda url, query: afetch_json("get_live_game_data", url, query, cached=False)
+            )
+            # The full feed already says whether the game is over
+            if feed_is_final(data):
+                game_archive.mark_final(game_pk)
+        else:
+            data = await afetch_json("get_live_game_data", *live_game_data_request(params))
         logger.info(f"Live game data fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_season_schedule", return_direct=True)
-    def get_season_schedule(tool_input: str) -> dict:
+    async def get_season_schedule(tool_input: str) -> dict:
         """Get MLB season schedule
         Args:
             tool_input: JSON string containing:
                 season: Year of the season
                 game_type: Type of game (R=Regular Season, P=Postseason, S=Spring Training)
                 sportId: Sport ID (1 for MLB)
+                team_id: Optional team to list the games of (e.g., 119 for LA Dodgers)
                 date: Specific date in MM/DD/YYYY format
+                start_date: Optional first date of a range, YYYY-MM-DD
+                end_date: Optional last date of a range, YYYY-MM-DD
                 hydrate: Additional data to include (e.g., 'team,stats')
         """
         params = json.loads(tool_input)
         season = params.get("season")
         game_type = params.get("game_type", "R")
-        sportId = params.get("sportId", "1")
-        date = params.get("date")
-        hydrate = params.get("hydrate")
         
         logger.info(f"Fetching season schedule for {season}, game type: {game_type}")
-        url = f"{MLB_API_BASE_V1}/schedule?sportId={sportId}&season={season}&gameType={game_type}"
-        if date:
-            url += f"&date={date}"
-        if hydrate:
-            url += f"&hydrate={hydrate}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("get_season_schedule", *season_schedule_request(params))
         logger.info(f"Season schedule fetched successfully for {season}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_team_roster", return_direct=True)
-    def get_team_roster(tool_input: str) -> dict:
+    async def get_team_roster(tool_input: str) -> dict:
         """Get team roster for a specific season
         Args:
             tool_input: JSON string containing:
@@ -231,20 +509,15 @@ class MLBTools:
         params = json.loads(tool_input)
         team_id = params.get("team_id")
         season = params.get("season")
-        hydrate = params.get("hydrate")
         
         logger.info(f"Fetching team roster for team_id: {team_id}, season: {season}")
-        url = f"{MLB_API_BASE_V1}/teams/{team_id}/roster?season={season}"
-        if hydrate:
-            url += f"&hydrate={hydrate}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("get_team_roster", *team_roster_request(params))
         logger.info(f"Team roster fetched successfully for team_id: {team_id}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_team_info", return_direct=True)
-    def get_team_info(tool_input: str) -> dict:
+    async def get_team_info(tool_input: str) -> dict:
         """Get detailed information about a team
         Args:
             tool_input: JSON string containing:
@@ -253,20 +526,15 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         team_id = params.get("team_id")
-        season = params.get("season")
         
         logger.info(f"Fetching team info for team_id: {team_id}")
-        url = f"{MLB_API_BASE_V1}/teams/{team_id}"
-        if season:
-            url += f"?season={season}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("get_team_info", *team_info_request(params))
         logger.info(f"Team info fetched successfully for team_id: {team_id}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_player_info", return_direct=True)
-    def get_player_info(tool_input: str) -> dict:
+    async def get_player_info(tool_input: str) -> dict:
         """Get detailed information about a player
         Args:
             tool_input: JSON string containing:
@@ -275,20 +543,15 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         player_id = params.get("player_id")
-        season = params.get("season")
         
         logger.info(f"Fetching player info for player_id: {player_id}")
-        url = f"{MLB_API_BASE_V1}/people/{player_id}"
-        if season:
-            url += f"?season={season}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("get_player_info", *player_info_request(params))
         logger.info(f"Player info fetched successfully for player_id: {player_id}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_game_boxscore", return_direct=True)
-    def get_game_boxscore(tool_input: str) -> dict:
+    async def get_game_boxscore(tool_input: str) -> dict:
         """Get detailed boxscore information for a specific game
         Args:
             tool_input: JSON string containing:
@@ -297,20 +560,15 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         game_pk = params.get("game_pk")
-        timecode = params.get("timecode")
         
         logger.info(f"Fetching boxscore for game_pk: {game_pk}")
-        url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/boxscore"
-        if timecode:
-            url += f"?timecode={timecode}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_game_json("get_game_boxscore", game_pk, *game_boxscore_request(params))
         logger.info(f"Boxscore fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_game_linescore", return_direct=True)
-    def get_game_linescore(tool_input: str) -> dict:
+    async def get_game_linescore(tool_input: str) -> dict:
         """Get linescore information for a specific game
         Args:
             tool_input: JSON string containing:
@@ -319,20 +577,15 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         game_pk = params.get("game_pk")
-        timecode = params.get("timecode")
         
         logger.info(f"Fetching linescore for game_pk: {game_pk}")
-        url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/linescore"
-        if timecode:
-            url += f"?timecode={timecode}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_game_json("get_game_linescore", game_pk, *game_linescore_request(params))
         logger.info(f"Linescore fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_game_plays", return_direct=True)
-    def get_game_plays(tool_input: str) -> dict:
+    async def get_game_plays(tool_input: str) -> dict:
         """Get detailed play-by-play information for a specific game
         Args:
             tool_input: JSON string containing:
@@ -343,29 +596,46 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         game_pk = params.get("game_pk")
-        timecode = params.get("timecode")
-        inning = params.get("inning")
-        top_bottom = params.get("top_bottom")
         
         logger.info(f"Fetching plays for game_pk: {game_pk}")
-        url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/plays"
-        params = []
-        if timecode:
-            params.append(f"timecode={timecode}")
-        if inning:
-            params.append(f"inning={inning}")
-        if top_bottom:
-            params.append(f"topBottom={top_bottom}")
-        if params:
-            url += "?" + "&".join(params)
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_game_json("get_game_plays", game_pk, *game_plays_request(params))
         logger.info(f"Plays fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
+
+    @staticmethod
+    @tool("query_game_plays", return_direct=True)
+    async def query_game_plays(tool_input: str) -> dict:
+        """Look up specific plays of a game from a local play-by-play index
+        Args:
+            tool_input: JSON string containing:
+                game_pk: Unique identifier for the game
+                inning: Optional inning number
+                top_bottom: Optional 'top' or 'bottom' of inning
+                batter: Optional batter name (e.g. 'Judge') or player id
+                pitcher: Optional pitcher name or player id
+                event: Optional event type (e.g. 'home_run', 'strikeout', 'double')
+                order_by: Optional 'wpa' for the biggest win-probability swings first
+                limit: Optional maximum number of plays to return
+        """
+        params = json.loads(tool_input)
+        game_pk = params.get("game_pk")
+        
+        logger.info(f"Querying play index for game_pk: {game_pk} with {params}")
+        data = (await play_store.aget(game_pk)).query(
+            inning=params.get("inning"),
+            top_bottom=params.get("top_bottom"),
+            batter=params.get("batter"),
+            pitcher=params.get("pitcher"),
+            event=params.get("event"),
+            order_by=params.get("order_by"),
+            limit=params.get("limit")
+        )
+        logger.info(f"Play index matched {data['matched']} plays for game_pk: {game_pk}")
+        return data
 
     @staticmethod
     @tool("get_player_stats", return_direct=True)
-    def get_player_stats(tool_input: str) -> dict:
+    async def get_player_stats(tool_input: str) -> dict:
         """Get detailed statistics for a specific player
         Args:
             tool_input: JSON string containing:
@@ -376,29 +646,15 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         player_id = params.get("player_id")
-        season = params.get("season")
-        group = params.get("group")
-        game_type = params.get("game_type", "R")
         
         logger.info(f"Fetching stats for player_id: {player_id}")
-        url = f"{MLB_API_BASE_V1}/people/{player_id}/stats"
-        query_params = []
-        if season:
-            query_params.append(f"season={season}")
-        if group:
-            query_params.append(f"group={group}")
-        if game_type:
-            query_params.append(f"gameType={game_type}")
-        if query_params:
-            url += "?" + "&".join(query_params)
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("get_player_stats", *player_stats_request(params))
         logger.info(f"Stats fetched successfully for player_id: {player_id}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_game_timestamps", return_direct=True)
-    def get_game_timestamps(tool_input: str) -> dict:
+    async def get_game_timestamps(tool_input: str) -> dict:
         """Get list of available timestamps for a specific game
         Args:
             tool_input: JSON string containing:
@@ -408,15 +664,13 @@ class MLBTools:
         game_pk = params.get("game_pk")
         
         logger.info(f"Fetching timestamps for game_pk: {game_pk}")
-        url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/feed/live/timestamps"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("get_game_timestamps", *game_timestamps_request(params))
         logger.info(f"Timestamps fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_game_decisions", return_direct=True)
-    def get_game_decisions(tool_input: str) -> dict:
+    async def get_game_decisions(tool_input: str) -> dict:
         """Get game decisions (winning/losing pitcher, save) for a specific game
         Args:
             tool_input: JSON string containing:
@@ -426,15 +680,13 @@ class MLBTools:
         game_pk = params.get("game_pk")
         
         logger.info(f"Fetching decisions for game_pk: {game_pk}")
-        url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/decisions"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_game_json("get_game_decisions", game_pk, *game_decisions_request(params))
         logger.info(f"Decisions fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_game_contextMetrics", return_direct=True)
-    def get_game_contextMetrics(tool_input: str) -> dict:
+    async def get_game_contextMetrics(tool_input: str) -> dict:
         """Get advanced metrics and context for a specific game
         Args:
             tool_input: JSON string containing:
@@ -443,20 +695,15 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         game_pk = params.get("game_pk")
-        timecode = params.get("timecode")
         
         logger.info(f"Fetching context metrics for game_pk: {game_pk}")
-        url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/contextMetrics"
-        if timecode:
-            url += f"?timecode={timecode}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("get_game_contextMetrics", *game_context_metrics_request(params))
         logger.info(f"Context metrics fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("get_game_winProbability", return_direct=True)
-    def get_game_winProbability(tool_input: str) -> dict:
+    async def get_game_winProbability(tool_input: str) -> dict:
         """Get win probability metrics for a specific game
         Args:
             tool_input: JSON string containing:
@@ -465,20 +712,15 @@ class MLBTools:
         """
         params = json.loads(tool_input)
         game_pk = params.get("game_pk")
-        timecode = params.get("timecode")
         
         logger.info(f"Fetching win probability for game_pk: {game_pk}")
-        url = f"{MLB_API_BASE_V1_1}/game/{game_pk}/winProbability"
-        if timecode:
-            url += f"?timecode={timecode}"
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_game_json("get_game_winProbability", game_pk, *game_win_probability_request(params))
         logger.info(f"Win probability fetched successfully for game_pk: {game_pk}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("search_player", return_direct=True)
-    def search_player(tool_input: str) -> dict:
+    async def search_player(tool_input: str) -> dict:
         """Search for a player by name
         Args:
             tool_input: JSON string containing:
@@ -488,15 +730,13 @@ class MLBTools:
         name = params.get("name")
         
         logger.info(f"Searching for player: {name}")
-        url = f"{MLB_API_BASE_V1}/people/search"
-        response = session.get(url, params={"names": name})
-        response.raise_for_status()
+        data = await afetch_json("search_player", *search_player_request(params))
         logger.info(f"Player search completed for: {name}")
-        return response.json()
+        return data
 
     @staticmethod
     @tool("search_teams", return_direct=True)
-    def search_teams(tool_input: str) -> dict:
+    async def search_teams(tool_input: str) -> dict:
         """Get list of all MLB teams or search for specific teams
         Args:
             tool_input: JSON string containing:
@@ -505,137 +745,455 @@ class MLBTools:
                 activeStatus: Optional boolean to filter active/inactive teams
         """
         params = json.loads(tool_input)
-        season = params.get("season")
-        sportId = params.get("sportId", "1")
-        activeStatus = params.get("activeStatus")
         
         logger.info("Fetching teams list")
-        url = f"{MLB_API_BASE_V1}/teams"
-        query_params = []
-        if season:
-            query_params.append(f"season={season}")
-        if sportId:
-            query_params.append(f"sportId={sportId}")
-        if activeStatus is not None:
-            query_params.append(f"activeStatus={str(activeStatus).lower()}")
-        if query_params:
-            url += "?" + "&".join(query_params)
-        response = session.get(url)
-        response.raise_for_status()
+        data = await afetch_json("search_teams", *search_teams_request(params))
         logger.info("Teams list fetched successfully")
-        return response.json()
-
-# Add a global event queue for streaming
-event_queue = Queue()
+        return data
 
 class StreamEvent(BaseModel):
     event_type: str
     data: Dict[str, Any]
     timestamp: datetime = Field(default_factory=datetime.now)
 
-async def event_generator(request: Request) -> AsyncGenerator[str, None]:
-    """Generate SSE events for streaming."""
-    while True:
-        if await request.is_disconnected():
+def emit_event(event_type: str, data: Dict[str, Any]):
+    """Send an SSE event to the client of the request being processed"""
+    emit(StreamEvent(event_type=event_type, data=data))
+
+async def event_generator(channel: EventChannel) -> AsyncGenerator[str, None]:
+    """Generate SSE events for streaming as soon as they are produced.
+
+    sse_starlette cancels this generator when the client disconnects; the
+    channel is closed either way so the workflow stops publishing to it.
+    """
+    finished = False
+    try:
+        async for event in channel:
+            yield json.dumps({
+                "event": event.event_type,
+                "data": {
+                    "timestamp": event.timestamp.isoformat(),
+                    **event.data
+                }
+            })
+            if event.event_type in ("workflow_complete", "workflow_error"):
+                finished = True
+                break
+    finally:
+        if not finished:
             logger.info("Client disconnected")
-            break
+        channel.close()
 
-        try:
-            # Non-blocking check for new events
-            try:
-                event = event_queue.get_nowait()
-                yield json.dumps({
-                    "event": event.event_type,
-                    "data": {
-                        "timestamp": event.timestamp.isoformat(),
-                        **event.data
-                    }
-                })
-            except:
-                await asyncio.sleep(0.1)  # Small delay to prevent CPU overuse
-        except Exception as e:
-            logger.error(f"Error in event generator: {str(e)}")
-            break
+# Active players and teams by name, so routing needs no search_* calls for
+# the common case
+entity_index = EntityIndex(lambda url, params: fetch_json("entity_index", url, params), MLB_API_BASE_V1)
+
+# Per-team schedules, so "last Dodgers game" resolves to a game_pk without
+# sending the season schedule through the LLM
+schedule_index = ScheduleIndex(lambda url, params: fetch_json("schedule_index", url, params), MLB_API_BASE_V1)
+
+# Final answers keyed on intent, replayed while their data is still fresh
+answer_cache = AnswerCache()
+
+def answer_ttl(tools_output: List[Dict[str, Any]]) -> Optional[float]:
+    """Seconds until the data behind an answer may change; None for never"""
+    ttls = []
+    for output in tools_output:
+        tool_input = output["input_data"]
+        game_pk = tool_input.get("game_pk")
+        if game_pk is not None and (tool_input.get("timecode") or game_archive.is_final(game_pk)):
+            continue
+        # query_game_plays reads the plays document
+        build_request = TOOL_REQUESTS.get(output["tool_name"], game_plays_request)
+        ttls.append(ttl_for(*build_request(tool_input)))
+    if not tools_output:
+        return DEFAULT_TTL
+    return min(ttls) if ttls else None
+
+def lookup_answer(state: Dict[str, Any]):
+    """Key the query on its intent and plan; replay a hit, record a miss"""
+    state["answer_key"] = intent_key(state["query"], state, state["pending_tool_calls"])
+    state["cached_answer"] = answer_cache.get(state["answer_key"])
+    if state["cached_answer"] is not None:
+        logger.info("Answer cache hit, replaying")
+        state["pending_tool_calls"] = []
+        return
+    channel = current_channel.get()
+    if channel is not None:
+        channel.start_recording()
+
+def store_answer(state: Dict[str, Any]):
+    channel = current_channel.get()
+    recording = channel.stop_recording() if channel is not None else None
+    if not state.get("answer_key") or recording is None:
+        return
+    if any(isinstance(output["output_data"], dict) and "error" in output["output_data"]
+           for output in state["tools_output"]):
+        return
+    answer_cache.put(
+        state["answer_key"],
+        [(event.event_type, event.data) for event in recording],
+        state["final_answer"],
+        answer_ttl(state["tools_output"])
+    )
+
+# Tools by name, for the workflow's tool execution
+TOOLS = {name: getattr(MLBTools, name) for name in [*TOOL_REQUESTS, "query_game_plays"]}
+
+# Routing rounds before the agent must answer with what it has
+MAX_TOOL_ROUNDS = 3
+
+# Tool calls of one request in flight at once; the rest of the round's
+# calls start as those finish
+MAX_PARALLEL_TOOLS = 4
+
+# Characters of each earlier tool output shown to the router, enough to
+# pick up ids from a search result
+ROUTING_CONTEXT_CHARS = 2000
+
+# Local router for clear-cut first rounds, trained from examples.json
+fast_router = FastRouter.from_file(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples.json"),
+    {name: tool.description.strip().split("\n")[0] for name, tool in TOOLS.items()}
+)
+logger.info(f"Fast router evaluation: {fast_router.evaluation}")
+
+# Event loop every workflow's tool calls run on; the server's once it has
+# started, else a private one on a daemon thread (scripts, tests)
+tool_loop: Optional[asyncio.AbstractEventLoop] = None
+_tool_loop_lock = threading.Lock()
+
+def run_on_tool_loop(coroutine):
+    """Run coroutine on the tool loop from a workflow thread and wait for it"""
+    global tool_loop
+    with _tool_loop_lock:
+        if tool_loop is None or tool_loop.is_closed():
+            tool_loop = asyncio.new_event_loop()
+            threading.Thread(target=tool_loop.run_forever, name="mlb-tools", daemon=True).start()
+        loop = tool_loop
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+ROUTING_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an MLB data agent. Decide which MLB Stats API tools to call next to answer the user's query.
+
+Available tools:
+{tool_descriptions}
+
+Reply with JSON only, in this form:
+{{"tool_calls": [{{"tool": "<tool name>", "input": {{<tool input fields>}}}}]}}
+
+List every call that can run now independently of the others; they are executed concurrently.
+If a call needs the output of another (for example an id from search_player), request only
+the first one now, you will be asked again with its output.
+Reply with {{"tool_calls": []}} when the data collected so far is enough to answer."""),
+    ("human", """Query: {query}
+
+Today's date: {today}
+
+Resolved from the query (use these ids instead of searching):
+{entities}
+
+Tool outputs so far:
+{tool_context}""")
+])
+
+RESPONSE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an MLB data assistant. Answer the user's query using only the data provided. "
+               "Be concise and specific; say so if the data does not contain the answer."),
+    ("human", """Query: {query}
+
+Data:
+{tool_data}""")
+])
+
+def _record_step(state: Dict[str, Any], node_name: str, started: datetime, **details):
+    state.setdefault("execution_steps", []).append({
+        "node_name": node_name,
+        "start_time": started.isoformat(),
+        "end_time": datetime.now().isoformat(),
+        **details
+    })
+
+def _parse_tool_calls(content: str) -> List[Dict[str, Any]]:
+    """Tool calls from the router reply, dropping unknown tools"""
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):]
+    plan = json.loads(text[text.find("{"):text.rfind("}") + 1])
+    calls = []
+    for call in plan.get("tool_calls", []):
+        if call.get("tool") in TOOLS:
+            calls.append({"tool": call["tool"], "input": call.get("input") or {}})
+        else:
+            logger.warning(f"Router asked for unknown tool {call.get('tool')}")
+    return calls
+
+def start(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry node: reset per-run fields"""
+    started = datetime.now()
+    emit_event("analysis_start", {"message": f"Analyzing query: {state['query']}"})
+    state.setdefault("tools_output", [])
+    state["pending_tool_calls"] = []
+    state["tool_rounds"] = 0
+    _record_step(state, "start", started)
+    return state
+
+def resolve_entities(state: Dict[str, Any]):
+    """Fill player_id/team_id from the local entity index"""
+    entities = entity_index.resolve(state["query"])
+    state["player_id"] = entities["player_id"]
+    state["team_id"] = entities["team_id"]
+    state["player_name"] = entities["player_name"]
+    state["team_name"] = entities["team_name"]
+    state["opponent_id"] = entities["opponent_id"]
+    state["opponent_name"] = entities["opponent_name"]
+    state["game_pk"] = None
+    state["game"] = None
+    try:
+        game = schedule_index.resolve(state["query"], entities["team_id"], entities["opponent_id"])
+    except Exception as e:
+        logger.error(f"Schedule lookup failed: {str(e)}")
+        game = None
+    if game is not None:
+        state["game_pk"] = game.game_pk
+        state["game"] = game.to_dict()
+    if entities["player_id"] or entities["team_id"]:
+        logger.info(f"Resolved entities locally: {entities}, game_pk: {state['game_pk']}")
+
+def describe_entities(state: Dict[str, Any]) -> str:
+    lines = []
+    if state.get("player_id"):
+        lines.append(f"- player: {state['player_name']} (player_id {state['player_id']})")
+    if state.get("team_id"):
+        lines.append(f"- team: {state['team_name']} (team_id {state['team_id']})")
+    if state.get("game"):
+        game = state["game"]
+        lines.append(
+            f"- game: {game['away_name']} at {game['home_name']} on {game['official_date']}, "
+            f"{game['detailed_state']} (game_pk {game['game_pk']})"
+        )
+    return "\n".join(lines) or "(none)"
+
+def should_use_tool(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the next set of independent tool calls: locally if clear-cut, else via the LLM"""
+    started = datetime.now()
+    state["pending_tool_calls"] = []
+    if state.get("tool_rounds", 0) >= MAX_TOOL_ROUNDS:
+        return state
+    # A fast-routed plan is the whole plan: its inputs already carry the
+    # resolved team and game, so there is nothing left to narrow down
+    if state.get("tool_rounds", 0) > 0 and state.get("fast_routed"):
+        return state
+
+    if state.get("tool_rounds", 0) == 0:
+        resolve_entities(state)
+    emit_event("routing_decision", {"query": state["query"]})
+    if state.get("tool_rounds", 0) == 0:
+        routing_started = time.perf_counter()
+        calls = fast_router.route(state["query"], state)
+        state["fast_routed"] = calls is not None
+        if calls is not None:
+            fast_router.record(True, time.perf_counter() - routing_started)
+            state["pending_tool_calls"] = calls
+            emit_event("analysis_complete", {"message": f"Selected tools: {[call['tool'] for call in calls]}"})
+            lookup_answer(state)
+            _record_step(state, "should_use_tool", started, messages=["fast route"])
+            return state
+    tool_context = "\n".join(
+        f"- {output['tool_name']}({json.dumps(output['input_data'])}): "
+        f"{json.dumps(output['output_data'])[:ROUTING_CONTEXT_CHARS]}"
+        for output in state["tools_output"]
+    ) or "(none)"
+    routing_started = time.perf_counter()
+    reply = llm.invoke(ROUTING_PROMPT.format_messages(
+        tool_descriptions="\n".join(f"- {name}: {tool.description}" for name, tool in TOOLS.items()),
+        query=state["query"],
+        today=datetime.now().strftime("%Y-%m-%d"),
+        entities=describe_entities(state),
+        tool_context=tool_context
+    ))
+    fast_router.record(False, time.perf_counter() - routing_started)
+    try:
+        calls = _parse_tool_calls(reply.content)
+    except (ValueError, AttributeError) as e:
+        logger.error(f"Could not parse routing reply: {str(e)}")
+        calls = []
+
+    state["pending_tool_calls"] = calls
+    emit_event("analysis_complete", {
+        "message": f"Selected tools: {[call['tool'] for call in state['pending_tool_calls']]}"
+    })
+    if state.get("tool_rounds", 0) == 0:
+        lookup_answer(state)
+    _record_step(state, "should_use_tool", started, messages=[reply.content])
+    return state
+
+def route_after_tool_selection(state: Dict[str, Any]) -> str:
+    if state.get("cached_answer") is not None:
+        return "replay_cached_answer"
+    return "execute_tools" if state.get("pending_tool_calls") else "generate_response"
+
+def replay_cached_answer(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Re-emit a cached run's events so the client sees the usual sequence"""
+    started = datetime.now()
+    cached = state["cached_answer"]
+    for event_type, data in cached.events:
+        emit_event(event_type, data)
+    state["final_answer"] = cached.final_answer
+    _record_step(state, "replay_cached_answer", started)
+    return state
+
+async def execute_tool(tool_name: str, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one tool on the tool loop, emitting tool_start/tool_complete/tool_error.
+
+    The output is projected to the fields the answer needs and held to the
+    tool's token budget before it goes anywhere near the LLM. Projection
+    walks multi-MB documents, so it runs in a worker thread, off the loop.
+    """
+    emit_event("tool_start", {"tool_name": tool_name, "input_data": tool_input})
+    started = time.perf_counter()
+    raw_tokens = None
+    try:
+        raw = await TOOLS[tool_name].ainvoke(json.dumps(tool_input))
+        raw_tokens = estimate_tokens(raw)
+        output = await asyncio.to_thread(project_tool_output, tool_name, tool_input, raw, context)
+        emit_event("tool_complete", {
+            "tool_name": tool_name,
+            "execution_time": time.perf_counter() - started,
+            "raw_tokens": raw_tokens,
+            "tokens": estimate_tokens(output)
+        })
+    except Exception as e:
+        logger.error(f"Tool {tool_name} failed: {str(e)}")
+        emit_event("tool_error", {"tool_name": tool_name, "error": str(e)})
+        output = {"error": str(e)}
+    execution_time = time.perf_counter() - started
+    return {
+        "tool_name": tool_name,
+        "input_data": tool_input,
+        "output_data": output,
+        "execution_time": execution_time,
+        "raw_tokens": raw_tokens
+    }
+
+async def run_tool_round(channel: Optional[EventChannel], calls: List[Dict[str, Any]],
+                         context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """All calls of a round as concurrent tasks, MAX_PARALLEL_TOOLS at a time; results in call order"""
+    # The tasks inherit this, so their events reach the request's channel
+    current_channel.set(channel)
+    slots = asyncio.Semaphore(MAX_PARALLEL_TOOLS)
+
+    async def run_call(call: Dict[str, Any]) -> Dict[str, Any]:
+        async with slots:
+            return await execute_tool(call["tool"], call["input"], context)
+
+    return await asyncio.gather(*(run_call(call) for call in calls))
+
+def execute_tools(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the selected tool calls concurrently on the tool loop.
+
+    Every request's calls share one event loop and the pooled async client,
+    so a waiting HTTP call holds no thread. Outputs are appended in the
+    order the router listed the calls, not in completion order, so the
+    response prompt is the same however the calls race.
+    """
+    started = datetime.now()
+    calls = state["pending_tool_calls"]
+    context = {key: state.get(key) for key in ("query", "player_id", "team_id", "game_pk")}
+    outputs = run_on_tool_loop(run_tool_round(current_channel.get(), calls, context))
+    state["tools_output"] = state["tools_output"] + outputs
+    state["pending_tool_calls"] = []
+    state["tool_rounds"] = state.get("tool_rounds", 0) + 1
+    _record_step(state, "execute_tools", started, tool_outputs=[
+        {"tool_name": output["tool_name"], "execution_time": output["execution_time"]} for output in outputs
+    ])
+    return state
+
+def generate_response(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer the query from the collected tool outputs, streaming tokens"""
+    started = datetime.now()
+    emit_event("response_generation_start", {})
+    tool_data = "\n\n".join(
+        f"{output['tool_name']} {json.dumps(output['input_data'])}:\n{json.dumps(output['output_data'])}"
+        for output in state["tools_output"]
+    ) or "(no data)"
+    # Stream tokens to the client as Gemini produces them; the full text is
+    # still assembled for final_answer
+    parts = []
+    first_token_at = None
+    for chunk in llm.stream(RESPONSE_PROMPT.format_messages(query=state["query"], tool_data=tool_data)):
+        if not chunk.content:
+            continue
+        if first_token_at is None:
+            first_token_at = datetime.now()
+        parts.append(chunk.content)
+        emit_event("response_token", {"token": chunk.content})
+    state["final_answer"] = "".join(parts)
+    emit_event("response_generation_complete", {"response": state["final_answer"]})
+    store_answer(state)
+    _record_step(
+        state, "generate_response", started,
+        time_to_first_token=(first_token_at - started).total_seconds() if first_token_at else None
+    )
+    return state
 
 def create_workflow() -> Graph:
-    """Create the workflow graph for the MLB Data Agent"""
+    """Create the workflow graph for the MLB Data Agent.
+
+    should_use_tool picks a set of independent tool calls, execute_tools
+    runs them concurrently, and control returns to should_use_tool for calls
+    that depend on those outputs until the router has nothing left to ask.
+    """
     workflow = Graph()
 
     # Define the workflow nodes
     workflow.add_node("start", start)
     workflow.add_node("should_use_tool", should_use_tool)
-    
-    # Add tool execution nodes
-    tools_map = {
-        "get_live_game_data": execute_live_game_data,
-        "get_season_schedule": execute_season_schedule,
-        "get_team_roster": execute_team_roster,
-        "get_team_info": execute_team_info,
-        "get_player_info": execute_player_info,
-        "get_game_boxscore": execute_game_boxscore,
-        "get_game_linescore": execute_game_linescore,
-        "get_game_plays": execute_game_plays,
-        "get_player_stats": execute_player_stats,
-        "get_game_timestamps": execute_game_timestamps,
-        "get_game_decisions": execute_game_decisions,
-        "get_game_contextMetrics": execute_game_contextMetrics,
-        "get_game_winProbability": execute_game_winProbability,
-        "search_player": execute_search_player,
-        "search_teams": execute_search_teams,
-        "generate_response": generate_response
-    }
-    
-    for node_name, node_func in tools_map.items():
-        workflow.add_node(node_name, node_func)
+    workflow.add_node("execute_tools", execute_tools)
+    workflow.add_node("generate_response", generate_response)
+    workflow.add_node("replay_cached_answer", replay_cached_answer)
 
     # Add edges
+    workflow.set_entry_point("start")
     workflow.add_edge("start", "should_use_tool")
-    
-    # Connect tool selection to execution
-    for tool_name in tools_map.keys():
-        workflow.add_edge("should_use_tool", tool_name)
-        if tool_name != "generate_response":
-            workflow.add_edge(tool_name, "should_use_tool")  # Allow chaining tools
-        workflow.add_edge(tool_name, "generate_response")    # All tools can lead to response
-
+    workflow.add_conditional_edges(
+        "should_use_tool",
+        route_after_tool_selection,
+        {
+            "execute_tools": "execute_tools",
+            "generate_response": "generate_response",
+            "replay_cached_answer": "replay_cached_answer"
+        }
+    )
+    workflow.add_edge("execute_tools", "should_use_tool")  # Allow chaining tools
     workflow.add_edge("generate_response", END)
+    workflow.add_edge("replay_cached_answer", END)
 
     return workflow
 
-def create_agent() -> Agent:
+def create_agent():
     """Create the MLB Data Agent"""
-    workflow = create_workflow()
-    
-    return Agent(
-        workflow,
-        DetailedAgentState(
-            query="",
-            messages=[],
-            tools_output=[],
-            final_answer=None,
-            player_id=None,
-            team_id=None,
-            game_pk=None,
-            execution_steps=[],
-            start_time=datetime.now()
-        )
-    )
+    return create_workflow().compile()
 
 # Initialize streaming agent workflow
 streaming_agent_workflow = create_agent()
 
+# Bounded workers for /query/stream; excess requests get a 429
+agent_pool = AgentPool()
+
 @app.post("/query/stream")
 async def stream_query(request: Request, query_request: QueryRequest):
     """Stream the query processing steps in real-time"""
     try:
         logger.info(f"Received streaming query: {query_request.query}")
         
-        # Clear the event queue
-        while not event_queue.empty():
-            event_queue.get()
+        # Events of this request only, pushed from the workflow thread
+        channel = EventChannel()
         
-        # Start workflow execution in a separate thread
+        # Runs on an agent pool worker thread
         def execute_workflow():
+            current_channel.set(channel)
             try:
                 start_time = datetime.now()
                 result = streaming_agent_workflow.invoke({
@@ -648,25 +1206,37 @@ async def stream_query(request: Request, query_request: QueryRequest):
                 })
                 
                 # Stream workflow completion event
-                event_queue.put(StreamEvent(
-                    event_type="workflow_complete",
-                    data={
-                        "final_answer": result["final_answer"],
-                        "total_execution_time": (datetime.now() - start_time).total_seconds()
-                    }
-                ))
+                emit_event("workflow_complete", {
+                    "final_answer": result["final_answer"],
+                    "total_execution_time": (datetime.now() - start_time).total_seconds()
+                })
             except Exception as e:
                 logger.error(f"Error in workflow execution: {str(e)}")
-                event_queue.put(StreamEvent(
-                    event_type="workflow_error",
-                    data={"error": str(e)}
-                ))
+                emit_event("workflow_error", {"error": str(e)})
         
-        # Start workflow execution thread
-        Thread(target=execute_workflow).start()
+        # Queue the workflow; clients waiting for a worker see their position
+        try:
+            agent_pool.submit(
+                execute_workflow,
+                on_position=lambda position: channel.put(StreamEvent(
+                    event_type="queue_position",
+                    data={"position": position}
+                )),
+                is_cancelled=lambda: channel.closed
+            )
+        except PoolFull as e:
+            logger.warning(f"Rejecting query, agent pool is full ({str(e)})")
+            channel.close()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many queries in progress, try again shortly",
+                headers={"Retry-After": "5"}
+            )
         
         # Return SSE response
-        return EventSourceResponse(event_generator(request))
+        return EventSourceResponse(event_generator(channel))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error setting up streaming: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
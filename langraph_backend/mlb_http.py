@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger("MLB_Agent")
+
+# Pool sizing for the shared async client
+MAX_CONNECTIONS = int(os.getenv("MLB_HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MLB_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = 30.0
+
+# httpx only limits the pool as a whole; this caps in-flight requests per host
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("MLB_HTTP_MAX_PER_HOST", "20"))
+
+# Same policy as the requests Session: 3 retries, exponential backoff
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 1.0
+RETRY_STATUS_FORCELIST = {500, 502, 503, 504}
+
+REQUEST_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class AsyncMLBClient:
+    """Pooled async HTTP client for the MLB Stats API.
+
+    Keeps connections alive across requests, optionally speaks HTTP/2
+    (MLB_HTTP2=1, needs the h2 package), bounds concurrency per host and
+    retries transient failures with asyncio.sleep instead of blocking a
+    thread. The underlying httpx client is created lazily and rebuilt if it
+    is used from a different event loop than the one it was created on.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        max_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        http2: Optional[bool] = None,
+        retries: int = RETRY_TOTAL,
+        backoff_factor: float = RETRY_BACKOFF_FACTOR,
+    ):
+        if http2 is None:
+            http2 = os.getenv("MLB_HTTP2") == "1"
+        if http2 and not _http2_available():
+            logger.warning("MLB_HTTP2 requested but h2 is not installed, using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _bind(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # Connections and semaphores belong to one loop; start over
+            self._loop = loop
+            self._host_slots = {}
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=REQUEST_TIMEOUT,
+                headers={"Accept-Encoding": "gzip"}
+            )
+        return self._client
+
+    def _slots(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_slots[host]
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET with retries on connection errors and retryable status codes."""
+        attempt = 0
+        while True:
+            try:
+                client = self._bind()
+                async with self._slots(url):
+                    response = await client.get(url, params=params, headers=headers)
+                if response.status_code not in RETRY_STATUS_FORCELIST or attempt >= self.retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise
+                reason = str(e) or type(e).__name__
+            delay = self.backoff_factor * (2 ** attempt)
+            attempt += 1
+            logger.warning(f"Retrying {url} in {delay}s ({reason}), attempt {attempt}/{self.retries}")
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> dict:
+        response = await self.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
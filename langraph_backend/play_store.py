@@ -0,0 +1,216 @@
+import math
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Games kept parsed in memory, least recently used dropped
+MAX_PLAY_TABLES = 128
+
+# A game in progress is re-parsed when its table is older than this
+LIVE_PLAYS_TTL = 10.0
+
+HALVES = ("top", "bottom")
+
+# Inning words an LLM may pass instead of a number ("ninth", "the third")
+INNING_WORDS = {
+    word: number
+    for number, words in enumerate([
+        ("first", "one"), ("second", "two"), ("third", "three"), ("fourth", "four"),
+        ("fifth", "five"), ("sixth", "six"), ("seventh", "seven"), ("eighth", "eight"),
+        ("ninth", "nine"), ("tenth", "ten"), ("eleventh", "eleven"), ("twelfth", "twelve"),
+        ("thirteenth", "thirteen"), ("fourteenth", "fourteen"), ("fifteenth", "fifteen"),
+    ], start=1)
+    for word in words
+}
+
+def parse_inning(value) -> Optional[int]:
+    """Inning number from 3, "3", "3rd", "ninth" or "top of the 9th"; None if there is none"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = int(value) if math.isfinite(value) and value == int(value) else 0
+    else:
+        text = str(value).lower()
+        digits = re.search(r"-?\d+", text)
+        if digits:
+            number = int(digits.group(0))
+        else:
+            number = next((INNING_WORDS[word] for word in re.findall(r"[a-z]+", text) if word in INNING_WORDS), 0)
+    return number if number >= 1 else None
+
+class PlayTable:
+    """One game's plays as parallel columns plus lookup indexes.
+
+    Built once from the plays document (and winProbability, for WPA), so
+    inning / half / batter / pitcher / event slices are set lookups and
+    intersections instead of a walk through the whole JSON document.
+    """
+
+    def __init__(self, plays_doc: dict, win_probability: Optional[List[dict]] = None):
+        self.at_bat = array("l")
+        self.inning = array("b")
+        self.half = array("b")
+        self.batter = array("l")
+        self.pitcher = array("l")
+        self.rbi = array("b")
+        self.away_score = array("h")
+        self.home_score = array("h")
+        self.scoring = array("b")
+        self.wpa = array("d")
+        self.event_type: List[str] = []
+        self.event: List[str] = []
+        self.description: List[str] = []
+        self.names: Dict[int, str] = {}
+
+        self.by_inning: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.by_batter: Dict[int, List[int]] = defaultdict(list)
+        self.by_pitcher: Dict[int, List[int]] = defaultdict(list)
+        self.by_event: Dict[str, List[int]] = defaultdict(list)
+
+        wpa_by_at_bat = {
+            entry.get("atBatIndex"): entry.get("homeTeamWinProbabilityAdded")
+            for entry in (win_probability or [])
+        }
+        for play in plays_doc.get("allPlays", []):
+            about = play.get("about", {})
+            matchup = play.get("matchup", {})
+            result = play.get("result", {})
+            if about.get("atBatIndex") is None:
+                continue
+            row = len(self.event)
+            batter, pitcher = matchup.get("batter", {}), matchup.get("pitcher", {})
+            half = 0 if about.get("halfInning") == "top" else 1
+            event_type = (result.get("eventType") or "").lower()
+
+            self.at_bat.append(about["atBatIndex"])
+            self.inning.append(about.get("inning") or 0)
+            self.half.append(half)
+            self.batter.append(batter.get("id") or 0)
+            self.pitcher.append(pitcher.get("id") or 0)
+            self.rbi.append(result.get("rbi") or 0)
+            self.away_score.append(result.get("awayScore") or 0)
+            self.home_score.append(result.get("homeScore") or 0)
+            self.scoring.append(1 if about.get("isScoringPlay") else 0)
+            wpa = wpa_by_at_bat.get(about["atBatIndex"])
+            self.wpa.append(float(wpa) if wpa is not None else math.nan)
+            self.event_type.append(event_type)
+            self.event.append(result.get("event") or "")
+            self.description.append(result.get("description") or "")
+            for person in (batter, pitcher):
+                if person.get("id"):
+                    self.names[person["id"]] = person.get("fullName")
+
+            self.by_inning[(self.inning[row], half)].append(row)
+            self.by_batter[self.batter[row]].append(row)
+            self.by_pitcher[self.pitcher[row]].append(row)
+            self.by_event[event_type].append(row)
+
+    def __len__(self) -> int:
+        return len(self.event)
+
+    def _people(self, who) -> List[int]:
+        """Player ids matching an id or a (partial, case-insensitive) name"""
+        if who is None or who == "":
+            return []
+        if isinstance(who, int) or str(who).isdigit():
+            return [int(who)]
+        needle = str(who).lower()
+        return [person_id for person_id, name in self.names.items() if name and needle in name.lower()]
+
+    def select(self, inning: Optional[int] = None, half=None, batter=None, pitcher=None, event=None) -> List[int]:
+        """Row numbers matching every given filter, in game order"""
+        candidates: Optional[set] = None
+
+        def narrow(rows):
+            nonlocal candidates
+            rows = set(rows)
+            candidates = rows if candidates is None else candidates & rows
+
+        if inning is not None:
+            halves = [HALVES.index(half)] if half in HALVES else [0, 1]
+            narrow(row for h in halves for row in self.by_inning.get((inning, h), []))
+        elif half in HALVES:
+            narrow(row for row in range(len(self)) if self.half[row] == HALVES.index(half))
+        if batter not in (None, ""):
+            narrow(row for person in self._people(batter) for row in self.by_batter.get(person, []))
+        if pitcher not in (None, ""):
+            narrow(row for person in self._people(pitcher) for row in self.by_pitcher.get(person, []))
+        if event not in (None, ""):
+            key = str(event).lower().replace(" ", "_")
+            narrow(row for event_type, rows in self.by_event.items() if key in event_type for row in rows)
+        return sorted(candidates) if candidates is not None else list(range(len(self)))
+
+    def biggest_swings(self, rows: List[int], limit: int) -> List[int]:
+        rows = [row for row in rows if not math.isnan(self.wpa[row])]
+        return sorted(rows, key=lambda row: abs(self.wpa[row]), reverse=True)[:limit]
+
+    def row(self, row: int) -> Dict[str, Any]:
+        return {
+            "at_bat_index": self.at_bat[row],
+            "inning": self.inning[row],
+            "half": HALVES[self.half[row]],
+            "batter": self.names.get(self.batter[row]),
+            "pitcher": self.names.get(self.pitcher[row]),
+            "event": self.event[row],
+            "description": self.description[row],
+            "rbi": self.rbi[row],
+            "score": f"{self.away_score[row]}-{self.home_score[row]}",
+            "home_wpa": None if math.isnan(self.wpa[row]) else round(self.wpa[row], 2)
+        }
+
+    def query(self, inning=None, top_bottom=None, batter=None, pitcher=None, event=None,
+              order_by: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        half = str(top_bottom).lower() if top_bottom else None
+        inning_number = parse_inning(inning) if inning not in (None, "") else None
+        rows = self.select(inning_number, half, batter, pitcher, event)
+        if order_by == "wpa":
+            rows = self.biggest_swings(rows, limit or 10)
+        elif limit:
+            rows = rows[:int(limit)]
+        result = {"total_plays": len(self), "matched": len(rows), "plays": [self.row(row) for row in rows]}
+        if inning not in (None, "") and inning_number is None:
+            # Tell the model its filter was dropped rather than failing the call
+            result["ignored"] = {"inning": f"could not read an inning number from {inning!r}"}
+        return result
+
+class PlayStore:
+    """Parsed PlayTables per game; final games are parsed once and kept.
+
+    load(game_pk) returns (plays document, winProbability list or None) and
+    is_final(game_pk) says whether the game can still change; both are
+    awaited, so a table is built on the event loop the tools run on.
+    """
+
+    def __init__(self, load: Callable[[Any], Awaitable[Tuple[dict, Optional[List[dict]]]]],
+                 is_final: Callable[[Any], Awaitable[bool]], max_games: int = MAX_PLAY_TABLES,
+                 live_ttl: float = LIVE_PLAYS_TTL):
+        self.load = load
+        self.is_final = is_final
+        self.max_games = max_games
+        self.live_ttl = live_ttl
+        self._tables: "OrderedDict[int, Tuple[PlayTable, float, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def aget(self, game_pk) -> PlayTable:
+        game_pk = int(game_pk)
+        with self._lock:
+            entry = self._tables.get(game_pk)
+            if entry is not None:
+                table, built_at, final = entry
+                if final or time.time() - built_at < self.live_ttl:
+                    self._tables.move_to_end(game_pk)
+                    return table
+        # Decide before loading, so a table built from pre-final data is
+        # never pinned as final
+        final = await self.is_final(game_pk)
+        plays_doc, win_probability = await self.load(game_pk)
+        table = PlayTable(plays_doc, win_probability)
+        with self._lock:
+            self._tables[game_pk] = (table, time.time(), final)
+            self._tables.move_to_end(game_pk)
+            while len(self._tables) > self.max_games:
+                self._tables.popitem(last=False)
+        return table
@@ -0,0 +1,163 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+# TTL (seconds) per endpoint family, first match wins. Live game documents
+# change every few seconds; rosters, teams and bios rarely.
+ENDPOINT_TTLS = [
+    (re.compile(r"/game/\d+/feed/live/timestamps$"), 15),
+    (re.compile(r"/game/\d+/(feed/live|linescore|plays|boxscore|contextMetrics|winProbability)$"), 10),
+    (re.compile(r"/game/\d+/decisions$"), 60),
+    (re.compile(r"/schedule$"), 5 * 60),
+    (re.compile(r"/people/\d+/stats$"), 60 * 60),
+    (re.compile(r"/teams/\d+/roster$"), 60 * 60),
+    (re.compile(r"/people/search$"), 24 * 60 * 60),
+    (re.compile(r"/people/\d+$"), 24 * 60 * 60),
+    (re.compile(r"/teams(/\d+)?$"), 24 * 60 * 60),
+]
+DEFAULT_TTL = 60
+
+# A timecode pins a game document to a moment in the past
+TIMECODE_TTL = 24 * 60 * 60
+
+MAX_ENTRIES = 512
+MAX_BYTES = 64 * 1024 * 1024
+
+def ttl_for(url: str, params: Optional[Dict[str, Any]]) -> int:
+    if params and params.get("timecode"):
+        return TIMECODE_TTL
+    path = urlsplit(url).path.rstrip("/")
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(path):
+            return ttl
+    return DEFAULT_TTL
+
+def cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """Normalize a request: lowercase scheme/host, sorted stringified params."""
+    parts = urlsplit(url)
+    query = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+    base = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/')}"
+    return f"{base}?{urlencode(query)}" if query else base
+
+@dataclass
+class CacheEntry:
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+class ResponseCache:
+    """LRU response cache with per-endpoint TTLs and conditional revalidation.
+
+    Fresh entries are served without touching the network. Expired entries
+    that carry an ETag or Last-Modified are revalidated with a conditional
+    GET, so an unchanged payload costs a 304 instead of a full download.
+    Bodies are kept as raw bytes and parsed per hit, so callers can never
+    mutate a cached document. Hit/miss counts are kept per tool.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, tool_name: str, outcome: str):
+        tool_stats = self._stats.setdefault(
+            tool_name, {"hits": 0, "misses": 0, "revalidated": 0, "bytes_saved": 0}
+        )
+        tool_stats[outcome] += 1
+
+    def _before(self, tool_name: str, key: str) -> Tuple[Optional[bytes], Dict[str, str]]:
+        """Return (fresh content, {}) on a hit, else (None, conditional headers)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, {}
+            self._entries.move_to_end(key)
+            if entry.expires_at > time.time():
+                self._count(tool_name, "hits")
+                self._stats[tool_name]["bytes_saved"] += len(entry.content)
+                return entry.content, {}
+            headers = {}
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            return None, headers
+
+    def _after(self, tool_name: str, key: str, ttl: int, status_code: int,
+               headers, content: Optional[bytes]) -> Optional[bytes]:
+        with self._lock:
+            if status_code == 304:
+                entry = self._entries.get(key)
+                if entry is None:
+                    # Evicted while revalidating; caller refetches in full
+                    return None
+                entry.expires_at = time.time() + ttl
+                self._count(tool_name, "revalidated")
+                self._stats[tool_name]["bytes_saved"] += len(entry.content)
+                return entry.content
+
+            self._count(tool_name, "misses")
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.content)
+            self._entries[key] = CacheEntry(
+                content=content,
+                etag=headers.get("ETag"),
+                last_modified=headers.get("Last-Modified"),
+                expires_at=time.time() + ttl
+            )
+            self._bytes += len(content)
+            self._evict()
+            return content
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry.content)
+
+    def get_json(self, tool_name: str, url: str, params: Optional[Dict[str, Any]],
+                 send: Callable[[Dict[str, str]], Any]) -> dict:
+        """Serve from cache or call send(headers) -> requests-style response."""
+        key = cache_key(url, params)
+        content, headers = self._before(tool_name, key)
+        ttl = ttl_for(url, params)
+        while content is None:
+            response = send(headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            content = self._after(tool_name, key, ttl, response.status_code,
+                                  response.headers, response.content)
+            headers = {}
+        return json.loads(content)
+
+    async def aget_json(self, tool_name: str, url: str, params: Optional[Dict[str, Any]], send) -> dict:
+        """Async variant of get_json; send(headers) is awaited."""
+        key = cache_key(url, params)
+        content, headers = self._before(tool_name, key)
+        ttl = ttl_for(url, params)
+        while content is None:
+            response = await send(headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            content = self._after(tool_name, key, ttl, response.status_code,
+                                  response.headers, response.content)
+            headers = {}
+        return json.loads(content)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "tools": {name: dict(counts) for name, counts in self._stats.items()}
+            }
@@ -0,0 +1,245 @@
+import logging
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger("MLB_Agent")
+
+# Window re-fetched on every refresh, where postponements and scores change
+SCHEDULE_REFRESH_DAYS_BACK = 3
+SCHEDULE_REFRESH_DAYS_AHEAD = 7
+SCHEDULE_REFRESH_SECONDS = 10 * 60
+
+# Regular season and postseason rounds
+SCHEDULE_GAME_TYPES = "R,F,D,L,W"
+
+# Games on the schedule that were not played on that date
+NOT_PLAYED = {"Postponed", "Cancelled"}
+
+@dataclass(frozen=True)
+class ScheduledGame:
+    game_pk: int
+    official_date: str
+    game_date: str
+    game_type: str
+    state: str
+    detailed_state: str
+    home_id: int
+    home_name: str
+    away_id: int
+    away_name: str
+    home_score: Optional[int]
+    away_score: Optional[int]
+
+    @property
+    def sort_key(self) -> str:
+        return f"{self.official_date}|{self.game_date}"
+
+    @property
+    def played(self) -> bool:
+        return self.detailed_state not in NOT_PLAYED
+
+    @property
+    def final(self) -> bool:
+        return self.state == "Final" and self.played
+
+    def involves(self, team_id: Optional[int]) -> bool:
+        return team_id is None or team_id in (self.home_id, self.away_id)
+
+    def hosted_by(self, team_id: int, home: Optional[bool]) -> bool:
+        """home=True: team_id is the home side; False: the away side; None: either"""
+        return home is None or (self.home_id == team_id) == home
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def _games_from_schedule(doc: dict) -> List[ScheduledGame]:
+    games = []
+    for day in doc.get("dates", []):
+        for game in day.get("games", []):
+            teams = game.get("teams", {})
+            home, away = teams.get("home", {}), teams.get("away", {})
+            status = game.get("status", {})
+            games.append(ScheduledGame(
+                game_pk=game["gamePk"],
+                official_date=game.get("officialDate") or day.get("date"),
+                game_date=game.get("gameDate", ""),
+                game_type=game.get("gameType", ""),
+                state=status.get("abstractGameState", ""),
+                detailed_state=status.get("detailedState", ""),
+                home_id=home.get("team", {}).get("id"),
+                home_name=home.get("team", {}).get("name"),
+                away_id=away.get("team", {}).get("id"),
+                away_name=away.get("team", {}).get("name"),
+                home_score=home.get("score"),
+                away_score=away.get("score")
+            ))
+    return games
+
+def _explicit_date(text: str) -> Optional[date]:
+    try:
+        match = re.search(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b", text)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        match = re.search(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b", text)
+        if match:
+            return date(int(match.group(3)), int(match.group(1)), int(match.group(2)))
+    except ValueError:
+        return None
+    return None
+
+class ScheduleIndex:
+    """Per-team sorted schedules answering last/next/on-date/A-vs-B locally.
+
+    A season is fetched once, the first time it is needed; a background
+    thread then re-fetches only a short window around today so
+    postponements, start-time changes and final scores are picked up.
+    Each team's games are kept sorted by (official date, start time) with a
+    parallel key list, so every lookup is a bisect plus a short scan. A
+    postponed game stays on its original date marked NOT_PLAYED and shows up
+    again on its new date.
+    """
+
+    def __init__(self, fetch: Callable[[str, Dict[str, Any]], dict], base_url: str,
+                 refresh_seconds: float = SCHEDULE_REFRESH_SECONDS):
+        self.fetch = fetch
+        self.base_url = base_url
+        self.refresh_seconds = refresh_seconds
+        self._games: Dict[Tuple[int, str], ScheduledGame] = {}
+        self._by_team: Dict[int, Tuple[List[str], List[ScheduledGame]]] = {}
+        self._seasons: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _fetch_games(self, **params) -> List[ScheduledGame]:
+        return _games_from_schedule(self.fetch(
+            f"{self.base_url}/schedule",
+            {"sportId": 1, "gameType": SCHEDULE_GAME_TYPES, **params}
+        ))
+
+    def _replace(self, games: List[ScheduledGame], first_day: str, last_day: str):
+        """Swap in the games fetched for [first_day, last_day] and reindex"""
+        with self._lock:
+            for key in [key for key in self._games if first_day <= key[1] <= last_day]:
+                del self._games[key]
+            for game in games:
+                self._games[(game.game_pk, game.official_date)] = game
+            by_team: Dict[int, List[ScheduledGame]] = {}
+            for game in self._games.values():
+                for team_id in (game.home_id, game.away_id):
+                    by_team.setdefault(team_id, []).append(game)
+            index = {}
+            for team_id, team_games in by_team.items():
+                team_games.sort(key=lambda game: game.sort_key)
+                index[team_id] = ([game.sort_key for game in team_games], team_games)
+            self._by_team = index
+
+    def load_season(self, season: int):
+        games = self._fetch_games(season=season)
+        self._replace(games, f"{season}-01-01", f"{season}-12-31")
+        self._seasons.add(season)
+        logger.info(f"Schedule index loaded {len(games)} games for {season}")
+
+    def ensure_season(self, season: int):
+        if season not in self._seasons:
+            self.load_season(season)
+
+    def refresh_window(self, today: Optional[date] = None):
+        today = today or date.today()
+        first = today - timedelta(days=SCHEDULE_REFRESH_DAYS_BACK)
+        last = today + timedelta(days=SCHEDULE_REFRESH_DAYS_AHEAD)
+        games = self._fetch_games(startDate=first.isoformat(), endDate=last.isoformat())
+        self._replace(games, first.isoformat(), last.isoformat())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if date.today().year in self._seasons:
+                    self.refresh_window()
+                else:
+                    self.load_season(date.today().year)
+            except Exception as e:
+                logger.error(f"Schedule index refresh failed: {str(e)}")
+            self._stop.wait(self.refresh_seconds)
+
+    def start(self):
+        """Load the current season, then keep refreshing, on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="schedule-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _team(self, team_id: int) -> Tuple[List[str], List[ScheduledGame]]:
+        return self._by_team.get(team_id, ([], []))
+
+    def on_date(self, team_id: int, day: date) -> List[ScheduledGame]:
+        keys, games = self._team(team_id)
+        day_key = day.isoformat()
+        start, end = bisect_left(keys, day_key), bisect_right(keys, day_key + "|~")
+        return [game for game in games[start:end] if game.played]
+
+    def last(self, team_id: int, today: date, opponent_id: Optional[int] = None,
+             home: Optional[bool] = None) -> Optional[ScheduledGame]:
+        """Most recent finished game up to and including today"""
+        keys, games = self._team(team_id)
+        for position in range(bisect_right(keys, today.isoformat() + "|~") - 1, -1, -1):
+            game = games[position]
+            if game.final and game.involves(opponent_id) and game.hosted_by(team_id, home):
+                return game
+        return None
+
+    def next(self, team_id: int, today: date, opponent_id: Optional[int] = None,
+             home: Optional[bool] = None) -> Optional[ScheduledGame]:
+        """First game from today on that has not finished"""
+        keys, games = self._team(team_id)
+        for game in games[bisect_left(keys, today.isoformat()):]:
+            if game.played and not game.final and game.involves(opponent_id) and game.hosted_by(team_id, home):
+                return game
+        return None
+
+    def _pick(self, games: List[ScheduledGame], opponent_id: Optional[int]) -> Optional[ScheduledGame]:
+        """One game of a day: the live one, else the latest finished, else the first"""
+        games = [game for game in games if game.involves(opponent_id)]
+        for game in games:
+            if game.state == "Live":
+                return game
+        finished = [game for game in games if game.final]
+        return finished[-1] if finished else (games[0] if games else None)
+
+    def resolve(self, query: str, team_id: Optional[int], opponent_id: Optional[int] = None,
+                today: Optional[date] = None) -> Optional[ScheduledGame]:
+        """The game a query like "yesterday's Yankees game" refers to"""
+        if team_id is None:
+            return None
+        today = today or date.today()
+        text = query.lower()
+        explicit = _explicit_date(text)
+        if explicit is not None:
+            # The current season is loaded by the refresh thread; older ones
+            # once, on first use
+            self.ensure_season(explicit.year)
+            return self._pick(self.on_date(team_id, explicit), opponent_id)
+        if re.search(r"\byesterday", text):
+            return self._pick(self.on_date(team_id, today - timedelta(days=1)), opponent_id)
+        if re.search(r"\btomorrow", text):
+            return self._pick(self.on_date(team_id, today + timedelta(days=1)), opponent_id)
+        if re.search(r"\b(today|tonight|current|live|now|ongoing)\b", text):
+            return self._pick(self.on_date(team_id, today), opponent_id)
+        # "next home game", "last road game"
+        home = True if re.search(r"\bhome\b", text) else False if re.search(r"\b(away|road)\b", text) else None
+        if re.search(r"\b(next|upcoming)\b", text):
+            return self.next(team_id, today, opponent_id, home)
+        if re.search(r"\b(last|latest|recent|previous)\b", text) or opponent_id is not None:
+            # "Astros vs Rangers" with no date: today's meeting, else the last one
+            if opponent_id is not None:
+                todays = self._pick(self.on_date(team_id, today), opponent_id)
+                if todays is not None and todays.state != "Preview":
+                    return todays
+            return self.last(team_id, today, opponent_id, home)
+        return None
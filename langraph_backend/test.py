@@ -106,7 +106,9 @@ async def test_single_query(client: httpx.AsyncClient, query: str):
                 except (ValueError, TypeError):
                     pass
             
-            if event_type == "analysis_start":
+            if event_type == "queue_position":
+                print(f"[{timestamp}] Waiting for a worker, queue position: {data.get('position')}")
+            elif event_type == "analysis_start":
                 print(f"[{timestamp}] Analysis started: {data.get('message', '')}")
             elif event_type == "analysis_complete":
                 print(f"[{timestamp}] Analysis completed: {data.get('message', '')}")
@@ -124,8 +126,10 @@ async def test_single_query(client: httpx.AsyncClient, query: str):
                 print(f"[{timestamp}] Tool error: {data.get('error', '')}")
             elif event_type == "response_generation_start":
                 print(f"[{timestamp}] Generating response...")
+            elif event_type == "response_token":
+                print(data.get('token', ''), end="", flush=True)
             elif event_type == "response_generation_complete":
-                print(f"[{timestamp}] Final response: {data.get('response', '')}")
+                print(f"\n[{timestamp}] Final response: {data.get('response', '')}")
             elif event_type == "workflow_complete":
                 total_time = data.get('total_execution_time', 0)
                 print(f"\nWorkflow completed in {total_time}s")
@@ -0,0 +1,318 @@
+import json
+import os
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from play_store import parse_inning
+
+# Rough tokens per serialized character for Gemini on JSON
+CHARS_PER_TOKEN = 4
+
+# Tokens a single tool output may take in the prompt, unless overridden below
+TOOL_OUTPUT_TOKEN_BUDGET = int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", "4000"))
+
+TOOL_TOKEN_BUDGETS = {
+    "get_game_plays": 6000,
+    "get_game_boxscore": 5000,
+    "get_season_schedule": 3000,
+    "get_game_timestamps": 500,
+}
+
+# Days of schedule kept either side of the game the question is about
+SCHEDULE_WINDOW_DAYS = 7
+
+NEXT_GAME = re.compile(r"\b(next|upcoming)\b")
+LAST_GAME = re.compile(r"\b(last|latest|recent|previous)\b")
+INNING_IN_QUERY = re.compile(r"\b([a-z0-9]+) inning\b")
+
+def estimate_tokens(data: Any) -> int:
+    return len(json.dumps(data, separators=(",", ":"), default=str)) // CHARS_PER_TOKEN
+
+def _team_line(side: dict) -> Dict[str, Any]:
+    record = side.get("leagueRecord", {})
+    return {
+        "team": side.get("team", {}).get("name"),
+        "score": side.get("score"),
+        "record": f"{record['wins']}-{record['losses']}" if "wins" in record else None
+    }
+
+def _linescore(linescore: dict) -> Dict[str, Any]:
+    return {
+        "current_inning": linescore.get("currentInning"),
+        "inning_half": linescore.get("inningHalf"),
+        "outs": linescore.get("outs"),
+        "innings": [
+            {
+                "inning": inning.get("num"),
+                "away": inning.get("away", {}).get("runs"),
+                "home": inning.get("home", {}).get("runs")
+            }
+            for inning in linescore.get("innings", [])
+        ],
+        "totals": {
+            side: {key: linescore.get("teams", {}).get(side, {}).get(key) for key in ("runs", "hits", "errors")}
+            for side in ("away", "home")
+        }
+    }
+
+def _play(play: dict) -> Dict[str, Any]:
+    about = play.get("about", {})
+    matchup = play.get("matchup", {})
+    result = play.get("result", {})
+    return {
+        "index": about.get("atBatIndex"),
+        "inning": about.get("inning"),
+        "half": about.get("halfInning"),
+        "batter": matchup.get("batter", {}).get("fullName"),
+        "pitcher": matchup.get("pitcher", {}).get("fullName"),
+        "event": result.get("event"),
+        "description": result.get("description"),
+        "rbi": result.get("rbi"),
+        "score": f"{result.get('awayScore')}-{result.get('homeScore')}",
+        "scoring": about.get("isScoringPlay")
+    }
+
+def _filter_plays(plays: List[dict], tool_input: Dict[str, Any]) -> List[dict]:
+    inning = tool_input.get("inning")
+    half = str(tool_input.get("top_bottom") or "").lower()
+    if inning not in (None, ""):
+        plays = [play for play in plays if str(play.get("about", {}).get("inning")) == str(inning)]
+    if half in ("top", "bottom"):
+        plays = [play for play in plays if play.get("about", {}).get("halfInning") == half]
+    return plays
+
+def project_live_game(data: dict, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    game_data = data.get("gameData", {})
+    live_data = data.get("liveData", {})
+    plays = live_data.get("plays", {})
+    all_plays = plays.get("allPlays", [])
+    return {
+        "game_pk": data.get("gamePk"),
+        "status": game_data.get("status", {}).get("detailedState"),
+        "date": game_data.get("datetime", {}).get("officialDate"),
+        "venue": game_data.get("venue", {}).get("name"),
+        "away_team": game_data.get("teams", {}).get("away", {}).get("name"),
+        "home_team": game_data.get("teams", {}).get("home", {}).get("name"),
+        "linescore": _linescore(live_data.get("linescore", {})),
+        "current_play": _play(plays["currentPlay"]) if plays.get("currentPlay") else None,
+        "scoring_plays": [_play(all_plays[index]) for index in plays.get("scoringPlays", []) if index < len(all_plays)],
+        "recent_plays": [_play(play) for play in _filter_plays(all_plays, tool_input)[-10:]],
+        "decisions": {
+            role: person.get("fullName")
+            for role, person in live_data.get("decisions", {}).items()
+        }
+    }
+
+def project_plays(data: dict, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    plays = _filter_plays(data.get("allPlays", []), tool_input)
+    return {
+        "filter": {"inning": tool_input.get("inning"), "top_bottom": tool_input.get("top_bottom")},
+        "play_count": len(plays),
+        "plays": [_play(play) for play in plays]
+    }
+
+def project_linescore(data: dict, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    return _linescore(data)
+
+def project_boxscore(data: dict, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    projected = {}
+    for side, team in data.get("teams", {}).items():
+        players = []
+        for player in team.get("players", {}).values():
+            stats = player.get("stats", {})
+            batting = stats.get("batting", {}).get("summary")
+            pitching = stats.get("pitching", {}).get("summary")
+            if batting or pitching:
+                players.append({
+                    "name": player.get("person", {}).get("fullName"),
+                    "position": player.get("position", {}).get("abbreviation"),
+                    "batting": batting,
+                    "pitching": pitching
+                })
+        team_stats = team.get("teamStats", {})
+        projected[side] = {
+            "team": team.get("team", {}).get("name"),
+            "batting": {key: team_stats.get("batting", {}).get(key) for key in ("runs", "hits", "homeRuns", "strikeOuts", "baseOnBalls", "leftOnBase")},
+            "pitching": {key: team_stats.get("pitching", {}).get(key) for key in ("earnedRuns", "strikeOuts", "baseOnBalls", "pitchesThrown")},
+            "players": players
+        }
+    return projected
+
+def _schedule_anchor(games: List[dict], tool_input: Dict[str, Any], context: Dict[str, Any]) -> int:
+    """Index of the game the question is about: the resolved game, else the
+    next or last one if asked for, else the first on or after the target date"""
+    for index, game in enumerate(games):
+        if context.get("game_pk") is not None and str(game["game_pk"]) == str(context["game_pk"]):
+            return index
+    today = (context.get("today") or date.today()).isoformat()
+    query = str(context.get("query") or "").lower()
+    if NEXT_GAME.search(query):
+        upcoming = [index for index, game in enumerate(games) if game["date"] >= today and not game["final"]]
+        if upcoming:
+            return upcoming[0]
+    if LAST_GAME.search(query):
+        finished = [index for index, game in enumerate(games) if game["date"] <= today and game["final"]]
+        if finished:
+            return finished[-1]
+    target = today
+    try:
+        month, day, year = str(tool_input.get("date") or "").split("/")
+        target = date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        pass
+    return next((index for index, game in enumerate(games) if game["date"] >= target), len(games) - 1)
+
+def project_schedule(data: dict, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Games around the one the question is about, not the whole season.
+
+    A season is ~2,430 games (162 for one team); only SCHEDULE_WINDOW_DAYS
+    either side of the anchor game are listed, with counts of the rest.
+    """
+    team_id = context.get("team_id")
+    games = []
+    for day in data.get("dates", []):
+        for game in day.get("games", []):
+            teams = game.get("teams", {})
+            if team_id and team_id not in (teams.get("away", {}).get("team", {}).get("id"),
+                                           teams.get("home", {}).get("team", {}).get("id")):
+                continue
+            games.append({
+                "game_pk": game.get("gamePk"),
+                "date": game.get("officialDate") or day.get("date"),
+                "status": game.get("status", {}).get("detailedState"),
+                "final": game.get("status", {}).get("abstractGameState") == "Final",
+                "away": _team_line(teams.get("away", {})),
+                "home": _team_line(teams.get("home", {}))
+            })
+    if not games:
+        return {"total_games": 0, "games": []}
+    anchor = games[_schedule_anchor(games, tool_input, context)]
+    anchor_day = date.fromisoformat(anchor["date"])
+    first = (anchor_day - timedelta(days=SCHEDULE_WINDOW_DAYS)).isoformat()
+    last = (anchor_day + timedelta(days=SCHEDULE_WINDOW_DAYS)).isoformat()
+    window = [game for game in games if first <= game["date"] <= last]
+    for game in games:
+        del game["final"]
+    return {
+        "total_games": len(games),
+        "season_dates": {"first": games[0]["date"], "last": games[-1]["date"]},
+        "window": {"from": first, "to": last},
+        "games_before_window": sum(game["date"] < first for game in games),
+        "games_after_window": sum(game["date"] > last for game in games),
+        "focus_game_pk": anchor["game_pk"],
+        "games": window
+    }
+
+def focus_schedule(projected: Any, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[tuple, int]:
+    games = projected.get("games", [])
+    focus_pk = projected.get("focus_game_pk")
+    return {("games",): index for index, game in enumerate(games) if game["game_pk"] == focus_pk}
+
+def focus_plays(projected: Any, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Dict[tuple, int]:
+    """An inning named in the query, else the end of the game (the result)"""
+    plays = projected.get("plays", [])
+    if not plays or tool_input.get("inning") not in (None, ""):
+        return {}
+    match = INNING_IN_QUERY.search(str(context.get("query") or "").lower())
+    inning = parse_inning(match.group(1)) if match else None
+    in_inning = [index for index, play in enumerate(plays) if inning is not None and play["inning"] == inning]
+    return {("plays",): in_inning[len(in_inning) // 2] if in_inning else len(plays) - 1}
+
+# Local extractors, keyed by tool name; tools not listed pass through and
+# are only held to their token budget
+PROJECTIONS: Dict[str, Callable[[dict, Dict[str, Any], Dict[str, Any]], Any]] = {
+    "get_live_game_data": project_live_game,
+    "get_game_plays": project_plays,
+    "get_game_linescore": project_linescore,
+    "get_game_boxscore": project_boxscore,
+    "get_season_schedule": project_schedule,
+}
+
+# Which item of a projected list the question is about, so budgeting trims
+# around it instead of keeping the head
+FOCUS: Dict[str, Callable[[Any, Dict[str, Any], Dict[str, Any]], Dict[tuple, int]]] = {
+    "get_game_plays": focus_plays,
+    "get_season_schedule": focus_schedule,
+}
+
+def _is_marker(item: Any) -> bool:
+    return isinstance(item, str) and item.startswith("... ") and item.endswith(" omitted")
+
+def _largest_list(data: Any) -> Optional[tuple]:
+    """Path to the largest list (by serialized size) that can still shrink"""
+    best, best_size = None, 0
+    stack = [(data, ())]
+    while stack:
+        node, path = stack.pop()
+        if isinstance(node, list):
+            items = [item for item in node if not _is_marker(item)]
+            if len(items) > 1:
+                size = estimate_tokens(node)
+                if size > best_size:
+                    best, best_size = path, size
+            else:
+                # Only look inside lists that cannot shrink themselves
+                stack.extend((item, path + (index,)) for index, item in enumerate(node))
+        elif isinstance(node, dict):
+            stack.extend((value, path + (key,)) for key, value in node.items())
+    return best
+
+def _get(data: Any, path: tuple) -> Any:
+    for key in path:
+        data = data[key]
+    return data
+
+def _omitted(marker: str) -> int:
+    return int(marker.split()[1])
+
+def _window(length: int, keep: int, center: Optional[int]) -> Tuple[int, int]:
+    """[start, end) of the keep items to hold on to: the head, or around center"""
+    if center is None:
+        return 0, keep
+    start = min(max(0, center - keep // 2), length - keep)
+    return start, start + keep
+
+def fit_to_budget(data: Any, budget: int, focus: Optional[Dict[tuple, int]] = None) -> Any:
+    """Halve the largest list until data fits.
+
+    Lists keep their head, except those in focus (path -> index of the item
+    the question is about), which keep a window around that item. Works on
+    a copy; every shortened list starts and/or ends with a marker telling
+    the LLM how many items were left out there.
+    """
+    if estimate_tokens(data) <= budget:
+        return data
+    data = json.loads(json.dumps(data, default=str))
+    focus = dict(focus or {})
+    while estimate_tokens(data) > budget:
+        path = _largest_list(data)
+        if path is None:
+            # Nothing left to shorten; a hard cut is still better than
+            # blowing the prompt
+            return {"truncated": json.dumps(data, default=str)[:budget * CHARS_PER_TOKEN]}
+        items = _get(data, path)
+        before = _omitted(items.pop(0)) if _is_marker(items[0]) else 0
+        after = _omitted(items.pop()) if _is_marker(items[-1]) else 0
+        start, end = _window(len(items), max(1, len(items) // 2), focus.get(path))
+        if path in focus:
+            focus[path] -= start
+        before += start
+        after += len(items) - end
+        items[:] = (
+            ([f"... {before} earlier items omitted"] if before else [])
+            + items[start:end]
+            + ([f"... {after} more items omitted"] if after else [])
+        )
+    return data
+
+def project_tool_output(tool_name: str, tool_input: Dict[str, Any], data: Any,
+                        context: Optional[Dict[str, Any]] = None) -> Any:
+    """What the LLM gets to see of a tool output"""
+    projection = PROJECTIONS.get(tool_name)
+    focus = None
+    if projection is not None and isinstance(data, dict):
+        data = projection(data, tool_input, context or {})
+        if tool_name in FOCUS:
+            focus = FOCUS[tool_name](data, tool_input, context or {})
+    return fit_to_budget(data, TOOL_TOKEN_BUDGETS.get(tool_name, TOOL_OUTPUT_TOKEN_BUDGET), focus)